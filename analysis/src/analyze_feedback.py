@@ -1,52 +1,47 @@
 import matplotlib.pyplot as plt
+import numpy as np
 import os
 from plot_utils import (
-    load_json, DATA_PATH, OUTPUT_DIR, set_paper_style, save_plot
+    stream_sessions, DATA_PATH, OUTPUT_DIR, set_paper_style, save_plot, wait_for_plots
 )
 
 # Configuration
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 QUESTIONS_PATH = os.path.join(PROJECT_ROOT, 'frontend', 'feedback_questions.json')
 
-def process_feedback_data(data):
+# (q_id, option_id) -> flat index into the (4, 8) count grid; only Q0-Q3 are counted
+FEEDBACK_KEYS = {(q, o): q * 8 + o for q in range(4) for o in range(8)}
+
+def process_feedback_data(session_iter):
     """Process feedback data and return counts for each question type."""
-    # Q0: Relevance (1=Rec, 2=Alt)
-    relevance_counts = {1: 0, 2: 0}
-    
-    # Q1, Q2, Q3: Likert scales (1-5)
-    clarity_counts = {i: 0 for i in range(1, 6)}
-    explanation_counts = {i: 0 for i in range(1, 6)}
-    alternative_counts = {i: 0 for i in range(1, 6)}
-    
     total_feedbacks = 0
-    
-    for session in data:
-        for conversation in session.get('conversations', []):
-            feedback_answers = conversation.get('feedback_answers')
-            if not feedback_answers:
-                continue
-                
-            total_feedbacks += 1
-            
-            for answer in feedback_answers:
-                q_id = answer.get('q_id')
-                option_id = answer.get('option_id')
-                
-                if option_id is None:
+
+    def answer_keys():
+        nonlocal total_feedbacks
+        for session in session_iter:
+            for conversation in session.get('conversations', []):
+                feedback_answers = conversation.get('feedback_answers')
+                if not feedback_answers:
                     continue
                     
-                if q_id == 0:
-                    if option_id in relevance_counts:
-                        relevance_counts[option_id] += 1
-                elif q_id == 1:
-                    if option_id in clarity_counts:
-                        clarity_counts[option_id] += 1
-                elif q_id == 2:
-                    if option_id in explanation_counts:
-                        explanation_counts[option_id] += 1
-                elif q_id == 3:
-                    if option_id in alternative_counts:
-                        alternative_counts[option_id] += 1
+                total_feedbacks += 1
+                
+                for answer in feedback_answers:
+                    key = FEEDBACK_KEYS.get((answer.get('q_id'), answer.get('option_id')))
+                    if key is not None:
+                        yield key
+
+    # Fill a typed int8 buffer directly instead of growing Python lists of boxed ints
+    keys = np.fromiter(answer_keys(), dtype=np.int8)
+    counts = np.bincount(keys, minlength=32).reshape(4, 8)
+
+    # Q0: Relevance (1=Rec, 2=Alt)
+    relevance_counts = {i: int(counts[0, i]) for i in (1, 2)}
+    
+    # Q1, Q2, Q3: Likert scales (1-5)
+    clarity_counts = {i: int(counts[1, i]) for i in range(1, 6)}
+    explanation_counts = {i: int(counts[2, i]) for i in range(1, 6)}
+    alternative_counts = {i: int(counts[3, i]) for i in range(1, 6)}
                         
     return total_feedbacks, relevance_counts, clarity_counts, explanation_counts, alternative_counts
 
@@ -244,13 +239,11 @@ def plot_pivoted_likert(clarity_counts, explanation_counts, alternative_counts):
 def analyze_feedback():
     print(f"Loading data from {DATA_PATH}")
     try:
-        data = load_json(DATA_PATH)
+        # Process data
+        total, relevance, clarity, explanation, alternative = process_feedback_data(stream_sessions(DATA_PATH))
     except FileNotFoundError:
         print(f"Error: Data file not found at {DATA_PATH}")
         return
-
-    # Process data
-    total, relevance, clarity, explanation, alternative = process_feedback_data(data)
     
     print(f"Total sessions with feedback: {total}")
     print("Relevance Counts:", relevance)
@@ -264,6 +257,7 @@ def analyze_feedback():
     plot_relevance(relevance)
     # plot_combined_likert(clarity, explanation, alternative)
     plot_pivoted_likert(clarity, explanation, alternative)
+    wait_for_plots()
 
     print(f"Plots saved to {OUTPUT_DIR}")
 
@@ -1,14 +1,16 @@
 import os
-import collections
+from functools import lru_cache
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 from plot_utils import (
-    load_json, DATA_PATH, set_paper_style, save_plot
+    stream_sessions, DATA_PATH, set_paper_style, save_plot, wait_for_plots
 )
 from utils import preprocess_text
 
+@lru_cache(maxsize=1024)
 def clean_city_name(city):
-    """Clean and preprocess city name."""
+    """Clean and preprocess city name. Cached, since the same cities recur across sessions."""
     if not city:
         return ""
     # Simple cleaning for city names - might not need full lemmatization/POS
@@ -21,12 +23,12 @@ def clean_city_name(city):
         cleaned = cleaned.replace(f, "")
     return cleaned.strip().title()
 
-def get_city_diversity_data(data):
+def get_city_diversity_data(session_iter):
     """Extract recommendation_shown and alternative cities."""
     recommended_cities = []
     alternative_cities = []
     
-    for session in data:
+    for session in session_iter:
         for cfe in session.get('cfe_responses', []):
             rec = cfe.get('recommendation_shown')
             alt = cfe.get('alternative_recommendation')
@@ -45,28 +47,29 @@ def get_city_diversity_data(data):
 
 def plot_city_diversity(recommended, alternative, top_n=10):
     """Plot stacked bar chart of city diversity."""
-    rec_counts = collections.Counter(recommended)
-    alt_counts = collections.Counter(alternative)
+    combined = pd.concat([
+        pd.DataFrame({'city': recommended, 'kind': 'rec'}),
+        pd.DataFrame({'city': alternative, 'kind': 'alt'})
+    ])
     
-    # Get all unique cities
-    all_cities = set(rec_counts.keys()) | set(alt_counts.keys())
-    
-    # Calculate total counts for sorting
-    total_city_counts = {city: rec_counts.get(city, 0) + alt_counts.get(city, 0) for city in all_cities}
-    
-    # Sort and take top N
-    sorted_cities = sorted(total_city_counts.keys(), key=lambda x: total_city_counts[x], reverse=True)
-    top_cities = sorted_cities[:top_n]
-    
-    if not top_cities:
+    if combined.empty:
         print("No city data found to plot.")
         return
 
+    # Per-city counts split by recommended/alternative
+    pivot = combined.pivot_table(index='city', columns='kind', aggfunc='size', fill_value=0)
+    pivot = pivot.reindex(columns=['rec', 'alt'], fill_value=0)
+    totals = pivot.sum(axis=1)
+    
+    # Sort and take top N
+    top_cities = totals.nlargest(top_n).index.tolist()
+
     # Total recommendations + alternatives for percentage calculation
-    total_samples = sum(total_city_counts.values())
+    total_samples = totals.sum()
     
-    rec_values = [rec_counts.get(city, 0) / total_samples * 100 for city in top_cities]
-    alt_values = [alt_counts.get(city, 0) / total_samples * 100 for city in top_cities]
+    top = pivot.loc[top_cities]
+    rec_values = (top['rec'] / total_samples * 100).tolist()
+    alt_values = (top['alt'] / total_samples * 100).tolist()
     
     plt.figure(figsize=(12, 8))
     
@@ -89,16 +92,16 @@ def plot_city_diversity(recommended, alternative, top_n=10):
 def main():
     print(f"Loading data from {DATA_PATH}")
     try:
-        data = load_json(DATA_PATH)
+        recommended, alternative = get_city_diversity_data(stream_sessions(DATA_PATH))
     except FileNotFoundError:
         print(f"Error: Data file not found at {DATA_PATH}")
         return
 
-    recommended, alternative = get_city_diversity_data(data)
     print(f"Found {len(recommended)} recommended and {len(alternative)} alternative cities.")
     
     set_paper_style()
     plot_city_diversity(recommended, alternative, top_n=15)
+    wait_for_plots()
     print("City diversity plots generated.")
 
 if __name__ == "__main__":
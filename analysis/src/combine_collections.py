@@ -1,6 +1,6 @@
-import json
+import orjson
 import os
-from collections import defaultdict
+import re
 
 # Robust paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -9,19 +9,36 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 
 DATA_PATH = os.path.join(PROJECT_ROOT, "data", "trace-crs-chatbot")
 ORIGINAL_EXPORTS_PATH = os.path.join(DATA_PATH, "original_firestore_exports")
+MERGED_PATH = os.path.join(DATA_PATH, "merged")
+
+
+def write_json(path, data):
+    """Serialize data with orjson and write it in a single call."""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE))
+
 
 print(f"Loading data from {ORIGINAL_EXPORTS_PATH}")
-with open(os.path.join(ORIGINAL_EXPORTS_PATH, "conversations.json")) as f:
-    conversations = json.load(f)
+with open(os.path.join(ORIGINAL_EXPORTS_PATH, "conversations.json"), "rb") as f:
+    conversations = orjson.loads(f.read())
+
+with open(os.path.join(ORIGINAL_EXPORTS_PATH, "cfe_pipeline_responses.json"), "rb") as f:
+    cfe_responses = orjson.loads(f.read())
 
-with open(os.path.join(ORIGINAL_EXPORTS_PATH, "cfe_pipeline_responses.json")) as f:
-    cfe_responses = json.load(f)
+# session_id -> merged session, filled in a single pass over both collections
+joined_by_id = {}
 
-conversations_by_id = defaultdict(list)
-cfe_responses_by_id = defaultdict(list)
+
+def _session_entry(session_id):
+    return joined_by_id.setdefault(
+        session_id,
+        {"session_id": session_id, "conversations": [], "cfe_responses": []}
+    )
 
 # Keywords to filter out sessions (Case Sensitive)
 blocked_keywords = ["Ashmi", "Adithi"]
+BLOCKED_RE = re.compile("|".join(map(re.escape, blocked_keywords)))
+ALPHA_TESTER_RE = re.compile("|".join(map(re.escape, blocked_keywords)), re.IGNORECASE)
 
 for s in conversations:
     if "feedback_answers" in s:
@@ -31,7 +48,7 @@ for s in conversations:
             # Check for q_id 4 (Additional Feedback)
             if fa.get("q_id") == 4:
                 answer_text = fa.get("answer", "")
-                if any(keyword in answer_text for keyword in blocked_keywords):
+                if BLOCKED_RE.search(answer_text):
                     is_invalid_session = True
                     break
         
@@ -39,25 +56,16 @@ for s in conversations:
             print(f"Skipping invalid session {s.get('session_id')} (marked as test via Q4)")
             continue
 
-    conversations_by_id[s["session_id"]].append(s)
+    _session_entry(s["session_id"])["conversations"].append(s)
 
 for e in cfe_responses:
-    cfe_responses_by_id[e["session_id"]].append(e)
-
-all_session_ids = set(conversations_by_id) | set(cfe_responses_by_id)
-
-joined = []
+    _session_entry(e["session_id"])["cfe_responses"].append(e)
 
-for session_id in all_session_ids:
-    joined.append({
-        "session_id": session_id,
-        "conversations": conversations_by_id.get(session_id, []),
-        "cfe_responses": cfe_responses_by_id.get(session_id, [])
-    })
+joined = list(joined_by_id.values())
 
 print(f"Saving original {len(joined)} sessions after filtering out alpha testers...")
-with open(DATA_PATH + "merged/combined_collections.json", "w") as f:
-    json.dump(joined, f, indent=4, ensure_ascii=False)
+os.makedirs(MERGED_PATH, exist_ok=True)
+write_json(os.path.join(MERGED_PATH, "combined_collections.json"), joined)
 
 # skip Ashmi and Adithi responses 
 filtered_cfe_responses = []
@@ -67,9 +75,8 @@ for session in joined:
         for feedback_q in feedback:
             if feedback_q.get('q_id') == 4:
                 ans = feedback_q.get('answer')
-                for name in ['Ashmi', 'Adithi']: 
-                    if name.lower() in ans.lower():
-                        session['skip'] = True
+                if ALPHA_TESTER_RE.search(ans):
+                    session['skip'] = True
 
         if session.get('skip'): 
             print(f"Skipping session {session['session_id']} due to alpha tester feedback...")
@@ -83,6 +90,5 @@ for session in joined:
         print(f"Error processing session {session['session_id']}: {e}")
 
 print(f"Saving {len(filtered_cfe_responses)} sessions after filtering out alpha testers...")
-with open(DATA_PATH + "merged/combined_collections_filtered.json", "w") as f:
-    json.dump(filtered_cfe_responses, f, indent=4, ensure_ascii=False)
+write_json(os.path.join(MERGED_PATH, "combined_collections_filtered.json"), filtered_cfe_responses)
 
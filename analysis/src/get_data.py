@@ -1,6 +1,7 @@
+import asyncio
 import firebase_admin
-from firebase_admin import credentials, firestore
-import json
+from firebase_admin import credentials, firestore_async
+import orjson
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -19,41 +20,58 @@ FIREBASE_COLLECTIONS = {
 }
 
 
-try:
-    # Initialize the Firebase Admin SDK
-    cred = credentials.Certificate(SERVICE_ACCOUNT_KEY_PATH)
-    firebase_admin.initialize_app(cred)
-    db = firestore.client()
+def _serialize_doc(doc):
+    """Convert a Firestore snapshot into JSON bytes, including its document ID."""
+    doc_data = doc.to_dict()
+    doc_data['id'] = doc.id
 
-    for COLLECTION_PATH, OUTPUT_FILE_NAME in FIREBASE_COLLECTIONS.items():
-        print(f"Fetching all documents from collection: {COLLECTION_PATH}...")
-        print("This may take a moment and will incur read costs.")
+    # Convert Firestore Timestamps to ISO format strings
+    for field in ("created_at", "updated_at"):
+        if field in doc_data and doc_data[field] is not None:
+            doc_data[field] = doc_data[field].isoformat()
+
+    return orjson.dumps(doc_data, option=orjson.OPT_INDENT_2)
 
-        # Get a reference to the collection and stream the documents
-        docs = db.collection(COLLECTION_PATH).stream()
-        all_docs = []
-        doc_count = 0
-        for doc in docs:
-            # Create a dictionary including the document ID and its data
-            try:
-                doc_data = doc.to_dict()
-                doc_data['id'] = doc.id
 
-                # Convert Firestore Timestamps to ISO format strings
-                for field in ("created_at", "updated_at"):
-                    if field in doc_data and doc_data[field] is not None:
-                        doc_data[field] = doc_data[field].isoformat()
+async def dump_collection(db, collection_path, output_file_name):
+    """Stream one collection into a JSON array file, one document at a time."""
+    print(f"Fetching all documents from collection: {collection_path}...")
+    print("This may take a moment and will incur read costs.")
 
-                all_docs.append(doc_data)
-                doc_count += 1
+    doc_count = 0
+    with open(output_file_name, 'wb') as f:
+        f.write(b'[\n')
+        # Get a reference to the collection and stream the documents
+        async for doc in db.collection(collection_path).stream():
+            try:
+                payload = _serialize_doc(doc)
             except Exception as e:
                 print(f"❌ Error processing document {doc.id}: {e}")
+                continue
 
-        # Write the list of documents to a local file as a nicely formatted JSON array
-        with open(OUTPUT_FILE_NAME, 'w', encoding='utf-8') as f:
-            json.dump(all_docs, f, indent=2, ensure_ascii=False)
+            if doc_count:
+                f.write(b',\n')
+            f.write(payload)
+            doc_count += 1
+        f.write(b'\n]\n')
 
-        print(f"✅ Success! {doc_count} documents were saved to {OUTPUT_FILE_NAME}")
+    print(f"✅ Success! {doc_count} documents were saved to {output_file_name}")
 
+
+async def main():
+    # Initialize the Firebase Admin SDK
+    cred = credentials.Certificate(SERVICE_ACCOUNT_KEY_PATH)
+    firebase_admin.initialize_app(cred)
+    db = firestore_async.client()
+
+    # Both collections are fetched concurrently; each is written as it streams in
+    await asyncio.gather(*(
+        dump_collection(db, collection_path, output_file_name)
+        for collection_path, output_file_name in FIREBASE_COLLECTIONS.items()
+    ))
+
+
+try:
+    asyncio.run(main())
 except Exception as e:
     print(f"❌ An error occurred: {e}")
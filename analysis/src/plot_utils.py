@@ -1,9 +1,14 @@
-import json
+try:
+    import ijson.backends.yajl2_c as ijson
+except ImportError:
+    import ijson
 import matplotlib.pyplot as plt
 import os
 import seaborn as sns
 import dotenv
 import shutil
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 
 dotenv.load_dotenv()
 
@@ -16,10 +21,10 @@ OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'plots')
 PAPER_LOCATION = os.getenv('PAPER_LOCATION')
 PAPER_PLOTS_DIR = os.path.join(PAPER_LOCATION, 'plots') if PAPER_LOCATION else None
 
-def load_json(path):
-    """Load JSON data from a file."""
-    with open(path, 'r') as f:
-        return json.load(f)
+def stream_sessions(path):
+    """Yield sessions one at a time from a JSON array file without loading it whole."""
+    with open(path, 'rb') as f:
+        yield from ijson.items(f, 'item', use_float=True)
 
 def ensure_dir(directory):
     """Ensure that a directory exists."""
@@ -59,15 +64,14 @@ def set_paper_style():
         'figure.max_open_warning': 0
     })
 
-def save_plot(filename_base, title=None):
-    """Save plot as both PDF and PNG, and copy to PAPER_PLOTS_DIR if available."""
+def _render_plot(fig_bytes, filename_base, title, png):
+    """Render a pickled figure to PDF (and optionally PNG) in a worker process."""
+    fig = pickle.loads(fig_bytes)
+
     ensure_dir(os.path.join(OUTPUT_DIR, "pdf"))
-    ensure_dir(os.path.join(OUTPUT_DIR, "png"))
-    
     pdf_path = os.path.join(OUTPUT_DIR, "pdf", f"{filename_base}.pdf")
-    png_path = os.path.join(OUTPUT_DIR, "png", f"{filename_base}.png")
     
-    plt.savefig(pdf_path, bbox_inches='tight', dpi=300)
+    fig.savefig(pdf_path, bbox_inches='tight', dpi=300)
     
     if PAPER_PLOTS_DIR:
         try:
@@ -77,8 +81,42 @@ def save_plot(filename_base, title=None):
         except Exception as e:
             print(f"Error copying to PAPER_PLOTS_DIR: {e}")
 
-    if title:
-        plt.title(title, fontweight='bold')
-    
-    plt.savefig(png_path, bbox_inches='tight', dpi=300)
-    plt.close()
+    if png:
+        ensure_dir(os.path.join(OUTPUT_DIR, "png"))
+        png_path = os.path.join(OUTPUT_DIR, "png", f"{filename_base}.png")
+
+        if title:
+            fig.gca().set_title(title, fontweight='bold')
+        
+        fig.savefig(png_path, bbox_inches='tight', dpi=300)
+
+    plt.close(fig)
+
+_POOL = None
+_PENDING = []
+
+def _get_pool():
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(
+            max_workers=max(1, (os.cpu_count() or 2) // 2),
+            initializer=set_paper_style
+        )
+    return _POOL
+
+def save_plot(filename_base, title=None, png=True):
+    """Save plot as both PDF and PNG, and copy to PAPER_PLOTS_DIR if available.
+
+    Rendering happens in a worker process; call wait_for_plots() before exiting.
+    Pass png=False to skip the raster copy when only the paper PDF is needed.
+    """
+    fig = plt.gcf()
+    fig_bytes = pickle.dumps(fig)
+    plt.close(fig)
+
+    _PENDING.append(_get_pool().submit(_render_plot, fig_bytes, filename_base, title, png))
+
+def wait_for_plots():
+    """Block until every submitted plot has been written, re-raising any render error."""
+    while _PENDING:
+        _PENDING.pop(0).result()
@@ -1,12 +1,20 @@
 import os
-from typing import Any
+import hashlib
+import sqlite3
 import numpy as np
 import pandas as pd
+import torch
 from pandas import DataFrame
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from sentence_transformers.quantization import quantize_embeddings
 
-from analysis.src.utils import extract_ic_evaluation_data, preprocess_text, load_data
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
+from analysis.src.utils import extract_ic_evaluation_data, preprocess_columns, load_data
 
 # Set paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -17,6 +25,76 @@ OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'data', 'trace-crs-chatbot', 'results')
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# On CPU-only machines let the encoder's intra-op kernels use every core
+if not torch.cuda.is_available():
+    torch.set_num_threads(os.cpu_count() or 1)
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+# Set EMBEDDING_PRECISION=int8 to compare quantized embeddings (faster, approximate)
+EMBEDDING_PRECISION = os.environ.get('EMBEDDING_PRECISION', 'float32')
+EMBEDDING_CACHE_PATH = os.path.join(OUTPUT_DIR, 'embedding_cache.sqlite')
+
+
+def _text_key(text: str) -> bytes:
+    # Model name is part of the key so switching encoders never returns stale vectors
+    return hashlib.blake2b(f"{MODEL_NAME}\0{text}".encode('utf-8'), digest_size=16).digest()
+
+
+# In-process memo in front of the sqlite cache, shared by every generate_similarity call
+_EMBEDDING_MEMO: dict[bytes, np.ndarray] = {}
+
+
+def encode_cached(model: SentenceTransformer, texts: list[str]) -> np.ndarray:
+    """
+    Encode texts into unit-length float32 embeddings, reusing vectors already seen
+    in this run or persisted in a sqlite cache, and encoding only the misses.
+    """
+    keys = [_text_key(t) for t in texts]
+    # key -> text for every distinct key not yet in memory
+    pending = {k: t for k, t in zip(keys, texts) if k not in _EMBEDDING_MEMO}
+
+    if pending:
+        with sqlite3.connect(EMBEDDING_CACHE_PATH) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS embeddings (hash BLOB PRIMARY KEY, vec BLOB)")
+            pending_keys = list(pending)
+            # Stay under sqlite's bound-parameter limit
+            for i in range(0, len(pending_keys), 900):
+                chunk = pending_keys[i:i + 900]
+                rows = conn.execute(
+                    f"SELECT hash, vec FROM embeddings WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+                )
+                _EMBEDDING_MEMO.update((h, np.frombuffer(v, dtype=np.float32)) for h, v in rows)
+
+            miss_keys = [k for k in pending if k not in _EMBEDDING_MEMO]
+            if miss_keys:
+                new_embeddings = model.encode(
+                    [pending[k] for k in miss_keys],
+                    batch_size=128,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=True
+                ).astype(np.float32)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (hash, vec) VALUES (?, ?)",
+                    [(k, emb.tobytes()) for k, emb in zip(miss_keys, new_embeddings)]
+                )
+                _EMBEDDING_MEMO.update(zip(miss_keys, new_embeddings))
+
+    return np.stack([_EMBEDDING_MEMO[k] for k in keys]) if keys else np.empty((0, 0), dtype=np.float32)
+
+
+def load_model() -> SentenceTransformer:
+    """
+    Load the MiniLM encoder. Set USE_ONNX=1 to run it through ONNX Runtime
+    (requires `optimum[onnxruntime]`); otherwise use PyTorch, in fp16 on CUDA.
+    """
+    if os.environ.get("USE_ONNX"):
+        provider = "CUDAExecutionProvider" if torch.cuda.is_available() else "CPUExecutionProvider"
+        return SentenceTransformer(MODEL_NAME, backend="onnx", model_kwargs={"provider": provider})
+    if torch.cuda.is_available():
+        return SentenceTransformer(MODEL_NAME, device='cuda').half()
+    return SentenceTransformer(MODEL_NAME)
+
 
 def run_evaluation():
     """
@@ -24,32 +102,44 @@ def run_evaluation():
     """
     print("Loading data...")
     data = load_data(INPUT_FILE)
-    extracted_data = extract_ic_evaluation_data(data)
+    df = extract_ic_evaluation_data(data)
     
-    if not extracted_data:
+    if df.empty:
         print("No valid IC evaluation data found.")
         return
 
-    df = pd.DataFrame(extracted_data)
     print(f"Extracted {len(df)} samples for analysis.")
 
     print("Initializing Sentence Transformer model (all-MiniLM-L6-v2)...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    model = load_model()
 
     print("Preprocessing text...")
-    df['conversation_clean'] = df['conversation_text'].apply(preprocess_text)
-    df['explanation_clean'] = df['explanation_shown'].apply(preprocess_text)
-    df['alt_explanation_clean'] = df['alternative_explanation'].apply(preprocess_text)
-    df ['persona_clean'] = df['persona'].apply(preprocess_text)
-    df ['travel_intent_clean'] = df['travel_intent'].apply(preprocess_text)
-    df ["intent_classifier_clean"] = df["persona_clean"] + " " + df["travel_intent_clean"]
+    clean_columns = {
+        'conversation_clean': 'conversation_text',
+        'explanation_clean': 'explanation_shown',
+        'alt_explanation_clean': 'alternative_explanation',
+        'persona_clean': 'persona',
+        'travel_intent_clean': 'travel_intent',
+    }
+    cleaned = preprocess_columns([df[src] for src in clean_columns.values()])
+    for name, series in zip(clean_columns, cleaned):
+        df[name] = series
+    df["intent_classifier_clean"] = [f"{p} {t}" for p, t in zip(df["persona_clean"], df["travel_intent_clean"])]
     # Combine explanations for comparison if desired, 
     # but usually we want to see similarity to what was shown.
     # The request asks for similarity between (query+cqs+as) AND (explanation shown + alternative explanation)
-    df['total_explanation'] = df['explanation_shown'] + " " + df['alternative_explanation']
-    df['total_explanation_clean'] = df['explanation_clean'] + " " + df['alt_explanation_clean']
+    df['total_explanation'] = [
+        f"{e} {a}" for e, a in zip(df['explanation_shown'].fillna(''), df['alternative_explanation'].fillna(''))
+    ]
+    df['total_explanation_clean'] = [f"{e} {a}" for e, a in zip(df['explanation_clean'], df['alt_explanation_clean'])]
 
     df["lorem_ipsum"] = "Lorem Ipsum is simply dummy text of the printing and typesetting industry. Lorem Ipsum has been the industry's standard dummy text ever since the 1500s, when an unknown printer took a galley of type and scrambled it to make a type specimen book. It has survived not only five centuries, but also the leap into electronic typesetting, remaining essentially unchanged. It was popularised in the 1960s with the release of Letraset sheets containing Lorem Ipsum passages, and more recently with desktop publishing software like Aldus PageMaker including versions of Lorem Ipsum."
+
+    # Encode the distinct texts of every compared column in one batch up front;
+    # the four comparisons below are then served from the in-process embedding memo
+    compared_columns = ["conversation_clean", "total_explanation_clean", "intent_classifier_clean", "lorem_ipsum"]
+    encode_cached(model, pd.unique(pd.concat([df[c] for c in compared_columns], ignore_index=True)).tolist())
+
     similarities = generate_similarity(df, model, col1 = "conversation_clean", col2="lorem_ipsum")
     print (f"Mean similarity between Conversations (C+CQA) and Lorem Ipsum: {np.mean(similarities):.4f} ({np.std(similarities):.4f}) ")
 
@@ -63,19 +153,35 @@ def run_evaluation():
     similarities = generate_similarity(df, model, col1 = "intent_classifier_clean", col2="total_explanation_clean")
     print(f"Mean similarity between Intent Classifier (IC: persona + travel_intent) and Explanations (CFE + AE): {np.mean(similarities):.4f} ({np.std(similarities):.4f}) ")
 
-def generate_similarity(df: DataFrame, model: SentenceTransformer, col1:str = "", col2:str = "") -> list[Any]:
+def generate_similarity(df: DataFrame, model: SentenceTransformer, col1:str = "", col2:str = "") -> np.ndarray:
     print("Generating embeddings (Cleaned)...")
-    conv_embeddings = model.encode(df[col1].tolist(), show_progress_bar=True)
-    exp_embeddings = model.encode(df[col2].tolist(), show_progress_bar=True)
+    # encode_cached encodes each distinct text once, so repeated rows (persona/intent,
+    # the constant lorem ipsum baseline) cost a single encoder pass
+    embeddings = encode_cached(model, df[col1].tolist() + df[col2].tolist())
+    conv_embeddings, exp_embeddings = embeddings[:len(df)], embeddings[len(df):]
 
     print("Calculating cosine similarities...")
-    similarities = []
-    for i in range(len(df)):
-        sim = cosine_similarity(
-            conv_embeddings[i].reshape(1, -1),
-            exp_embeddings[i].reshape(1, -1)
-        )[0][0]
-        similarities.append(sim)
+    if EMBEDDING_PRECISION == 'int8':
+        # Calibrate on both sides together so the two matrices share one quantization scale
+        quantized = quantize_embeddings(np.vstack([conv_embeddings, exp_embeddings]), precision='int8')
+        conv_q, exp_q = quantized[:len(df)], quantized[len(df):]
+        if SIMSIMD_AVAILABLE:
+            similarities = 1.0 - np.asarray(simsimd.cosine(conv_q, exp_q))
+        else:
+            conv_q = conv_q.astype(np.float32)
+            exp_q = exp_q.astype(np.float32)
+            similarities = np.einsum('ij,ij->i', conv_q, exp_q) / (
+                np.linalg.norm(conv_q, axis=1) * np.linalg.norm(exp_q, axis=1)
+            )
+    elif SIMSIMD_AVAILABLE:
+        # Row-wise SIMD cosine distance between matching rows of the two matrices
+        similarities = 1.0 - np.asarray(simsimd.cosine(
+            np.ascontiguousarray(conv_embeddings, dtype=np.float32),
+            np.ascontiguousarray(exp_embeddings, dtype=np.float32)
+        ))
+    else:
+        # Embeddings are already unit-length, so cosine similarity is a row-wise dot product
+        similarities = np.einsum('ij,ij->i', conv_embeddings, exp_embeddings)
     return similarities
 
 
@@ -1,6 +1,7 @@
-import json
+import orjson
 import os
 import re
+from functools import lru_cache
 import pandas as pd
 import nltk
 from nltk.corpus import stopwords
@@ -31,64 +32,105 @@ def download_nltk_data():
         except Exception as e:
             print(f"Failed to download {resource}: {e}")
 
-download_nltk_data()
+_nltk_ready = False
+
+def _ensure_nltk_data():
+    """Download NLTK resources on first use rather than at import."""
+    global _nltk_ready
+    if not _nltk_ready:
+        download_nltk_data()
+        _nltk_ready = True
+
+_LEMMATIZER = WordNetLemmatizer()
+# Penn Treebank tag prefixes kept by preprocess_text: nouns, adjectives, verbs
+_POS_KEEP = frozenset({'NN', 'JJ', 'VB'})
+
+# Conversational filler phrases, fused into one pattern so each text is scanned once
+FILLERS = [
+    r"i recommend", r"based on your interest in", r"you might like",
+    r"sure, i can help", r"here is a", r"i found", r"it seems like",
+    r"according to your", r"i've selected", r"looking at your preferences"
+]
+_FILLER_RE = re.compile("|".join(FILLERS))
+
+@lru_cache(maxsize=None)
+def _english_stop_words():
+    # Raises LookupError (and is retried next call) if the corpus is missing
+    return frozenset(stopwords.words('english'))
 
 def preprocess_text(text):
     if not text or not isinstance(text, str):
         return ""
 
+    _ensure_nltk_data()
+
     # 1. Lowercase and remove conversational filler phrases
     text = text.lower()
-    fillers = [
-        r"i recommend", r"based on your interest in", r"you might like",
-        r"sure, i can help", r"here is a", r"i found", r"it seems like",
-        r"according to your", r"i've selected", r"looking at your preferences"
-    ]
-    for filler in fillers:
-        text = re.sub(filler, "", text)
+    text = _FILLER_RE.sub("", text)
+
+    return _clean_tokens(text)
 
-    # 2. Tokenize and remove punctuation/numbers
+def _clean_tokens(text):
+    """Steps 2-5 of preprocess_text, on already lowercased, filler-free text."""
+    # 2. Tokenize
     try:
         tokens = word_tokenize(text)
     except LookupError:
         # Fallback if punkt fails
         tokens = text.split()
         
-    tokens = [t for t in tokens if t.isalpha()]
-
-    # 3. Remove stopwords
+    # 3. Remove punctuation/numbers and stopwords in one pass
     try:
-        stop_words = set(stopwords.words('english'))
-        tokens = [t for t in tokens if t not in stop_words]
+        stop_words = _english_stop_words()
     except LookupError:
-        pass
+        stop_words = frozenset()
+    tokens = [t for t in tokens if t.isalpha() and t not in stop_words]
 
     # 4. POS Tagging and filtering (keep Nouns, Adjectives, Verbs)
     try:
         tagged = nltk.pos_tag(tokens)
-        tokens = [word for word, tag in tagged if any(tag.startswith(p) for p in ['NN', 'JJ', 'VB'])]
+        tokens = [word for word, tag in tagged if tag[:2] in _POS_KEEP]
     except LookupError:
         # If POS tagging fails, just keep the tokens as is (filtered by stop words)
         pass
 
     # 5. Lemmatization
     try:
-        lemmatizer = WordNetLemmatizer()
-        tokens = [lemmatizer.lemmatize(t) for t in tokens]
+        tokens = [_LEMMATIZER.lemmatize(t) for t in tokens]
     except LookupError:
         pass
 
     return " ".join(tokens)
 
-def extract_ic_evaluation_data(data):
+def preprocess_columns(columns):
     """
-    Extracts data for Intent Classification (IC) evaluation:
-    - User Query + Clarifying Questions + Answers
-    - Explanation shown
-    - Alternative explanation
+    Preprocess several text Series in one pass and return one cleaned Series per input.
+
+    Lowercasing and filler removal run as vectorised .str ops over all values stacked
+    together, and the NLTK steps run once per distinct string. Equivalent to calling
+    preprocess_text on every value.
     """
-    extracted = []
+    _ensure_nltk_data()
+
+    stacked = pd.concat([col.reset_index(drop=True) for col in columns], ignore_index=True)
+    stacked = stacked.map(lambda v: v if isinstance(v, str) else "")
+    normalized = stacked.str.lower().str.replace(_FILLER_RE, "", regex=True)
+
+    codes, uniques = pd.factorize(normalized)
+    cleaned_uniques = [_clean_tokens(t) for t in uniques]
+    cleaned = [cleaned_uniques[c] for c in codes]
+
+    results = []
+    offset = 0
+    for col in columns:
+        results.append(pd.Series(cleaned[offset:offset + len(col)], index=col.index, dtype=object))
+        offset += len(col)
+    return results
+
+def _iter_classified_cfes(data):
+    """Yield (session_id, cfe, intent_classification) for every CFE response with IC context."""
     for session in data:
+        session_id = session.get('session_id')
         for cfe in session.get('cfe_responses', []):
             context = cfe.get('context')
             if not context:
@@ -96,70 +138,83 @@ def extract_ic_evaluation_data(data):
             ic = context.get('intent_classification')
             if not ic:
                 continue
-            input_data_list = ic.get('input_data', [])
-            
-            if not input_data_list:
-                continue
-                
-            input_data = input_data_list[0]
-            user_query = input_data.get('user_query', '')
-            cqs = input_data.get('clarified_qa', [])
-            
-            # Combine user query, clarifying questions and answers
-            conversation_text = user_query
-            for cq in cqs:
-                q = cq.get('question', '')
-                a = cq.get('answer', '')
-                conversation_text += f" {q} {a}"
-                
-            explanation_shown = cfe.get('explanation_shown', '')
-            alt_explanation = cfe.get('alternative_explanation', '')
-
-            persona = ic.get('user_travel_persona')
-            travel_intent = ic.get('travel_intent')
-            
-            # Alternative explanation can be a list or a string
-            if isinstance(alt_explanation, list):
-                alt_explanation = " ".join(map(str, alt_explanation))
-            
-            extracted.append({
-                'session_id': session.get('session_id'),
-                'conversation_text': conversation_text,
-                'explanation_shown': explanation_shown,
-                'alternative_explanation': alt_explanation,
-                'persona': persona,
-                'travel_intent': travel_intent
-            })
-    return extracted
-
-def extract_persona_explanation_pairs(data):
-    pairs = []
-    for session in data:
-        for cfe in session.get('cfe_responses', []):
-            context = cfe.get('context')
-            if not context:
-                continue
+            yield session_id, cfe, ic
+
+def _new_ic_columns():
+    return {
+        'session_id': [],
+        'conversation_text': [],
+        'explanation_shown': [],
+        'alternative_explanation': [],
+        'persona': [],
+        'travel_intent': []
+    }
+
+def _append_ic_row(columns, session_id, cfe, ic):
+    input_data_list = ic.get('input_data', [])
+    
+    if not input_data_list:
+        return
+        
+    input_data = input_data_list[0]
+    user_query = input_data.get('user_query', '')
+    cqs = input_data.get('clarified_qa', [])
+    
+    # Combine user query, clarifying questions and answers
+    conversation_text = " ".join([
+        user_query,
+        *(f"{cq.get('question', '')} {cq.get('answer', '')}" for cq in cqs)
+    ])
+        
+    explanation_shown = cfe.get('explanation_shown', '')
+    alt_explanation = cfe.get('alternative_explanation', '')
+    
+    # Alternative explanation can be a list or a string
+    if isinstance(alt_explanation, list):
+        alt_explanation = " ".join(map(str, alt_explanation))
+    
+    columns['session_id'].append(session_id)
+    columns['conversation_text'].append(conversation_text)
+    columns['explanation_shown'].append(explanation_shown)
+    columns['alternative_explanation'].append(alt_explanation)
+    columns['persona'].append(ic.get('user_travel_persona'))
+    columns['travel_intent'].append(ic.get('travel_intent'))
+
+def _append_persona_pair(pairs, session_id, cfe, ic):
+    persona = ic.get('user_travel_persona')
+    explanation = cfe.get('explanation_shown')
+
+    if not (persona and explanation):
+        return
+
+    pairs.append({
+        'session_id': session_id,
+        'persona': persona,
+        'travel_intent': ic.get('travel_intent'),
+        'explanation': explanation,
+        'recommendation': cfe.get('recommendation_shown'),
+        'alternative_shown': cfe.get('alternative_recommendation'),
+        'alternative_explanation': cfe.get('alternative_explanation')
+    })
 
-            intent_classification = context.get('intent_classification')
-            if not intent_classification:
-                continue
+def extract_ic_evaluation_data(data):
+    """
+    Extracts data for Intent Classification (IC) evaluation:
+    - User Query + Clarifying Questions + Answers
+    - Explanation shown
+    - Alternative explanation
+
+    Returns a DataFrame built directly from per-column lists.
+    """
+    columns = _new_ic_columns()
+    for session_id, cfe, ic in _iter_classified_cfes(data):
+        _append_ic_row(columns, session_id, cfe, ic)
+    return pd.DataFrame(columns)
 
-            persona = intent_classification.get('user_travel_persona')
-            explanation = cfe.get('explanation_shown')
-            travel_intent = intent_classification.get('travel_intent')
-            alternative_explanations = cfe.get('alternative_explanation')
-            alternative_shown = cfe.get('alternative_recommendation')
-
-            if persona and explanation:
-                pairs.append({
-                    'session_id': session.get('session_id'),
-                    'persona': persona,
-                    'travel_intent': travel_intent,
-                    'explanation': explanation,
-                    'recommendation': cfe.get('recommendation_shown'),
-                    'alternative_shown': alternative_shown,
-                    'alternative_explanation': alternative_explanations
-                })
+def extract_persona_explanation_pairs(session_iter):
+    pairs = []
+    for session_id, cfe, ic in _iter_classified_cfes(session_iter):
+        _append_persona_pair(pairs, session_id, cfe, ic)
     return pairs
 
 
@@ -167,5 +222,5 @@ def load_data(file_path):
     if not os.path.exists(file_path):
         print(f"Error: File {file_path} not found.")
         return []
-    with open(file_path, 'r') as f:
-        return json.load(f)
+    with open(file_path, 'rb') as f:
+        return orjson.loads(f.read())
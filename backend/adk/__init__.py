@@ -0,0 +1,4 @@
+from dotenv import load_dotenv
+
+# Loaded once for the whole package instead of at every agent/assembly import
+load_dotenv()
@@ -0,0 +1,9 @@
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader
+
+# backend/prompts, resolved from this file so it does not depend on the working directory
+PROMPT_DIR = Path(__file__).resolve().parent.parent.parent / "prompts"
+
+# Shared by every module that renders prompts, so each template is parsed once per process
+ENV = Environment(loader=FileSystemLoader(str(PROMPT_DIR)), auto_reload=False)
@@ -1,30 +1,39 @@
 from google.adk.agents.llm_agent import Agent
-from jinja2 import Environment, FileSystemLoader
-from dotenv import load_dotenv
-import os
+from backend.adk.agents._jinja import ENV
 
 from backend.adk.tools.cfe import cfe_callback
 from backend.schema.cfe import CFEOutput
 
-load_dotenv()
+# The prompt takes no variables, so render it once at import
+CFE_INSTRUCTION = ENV.get_template("cfe_combination.jinja2").render()
 
-PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../../../prompts/")
-ENV = Environment(loader=FileSystemLoader(PROMPT_DIR))
+_cfe_agent = None
 
 
-async def get_cfe_agent():
+def build_cfe_agent():
     """
-    Get the CFE (Counterfactual Explanation) agent that combines
+    Build a new CFE (Counterfactual Explanation) agent that combines
     baseline and context-aware recommendations.
     """
-    template = ENV.get_template("cfe_combination.jinja2")
-    
-    cfe_agent = Agent(
+    return Agent(
         model='gemini-2.5-flash',
         name='CFEAgent',
         description='Agent that combines baseline and context-aware recommendations with counterfactual explanations.',
-        instruction=template.render(),
+        instruction=CFE_INSTRUCTION,
         output_schema=CFEOutput,
         before_model_callback=cfe_callback
     )
-    return cfe_agent
+
+
+def get_cfe_agent():
+    """
+    Get the CFE (Counterfactual Explanation) agent that combines
+    baseline and context-aware recommendations.
+
+    The agent is built once and reused. Use build_cfe_agent() when the agent
+    is going to be attached to a parent, since ADK agents can only have one.
+    """
+    global _cfe_agent
+    if _cfe_agent is None:
+        _cfe_agent = build_cfe_agent()
+    return _cfe_agent
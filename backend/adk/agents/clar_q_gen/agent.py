@@ -1,25 +1,28 @@
 from google.adk.agents.llm_agent import Agent
-from jinja2 import Environment, FileSystemLoader
-from dotenv import load_dotenv
-import os
+from backend.adk.agents._jinja import ENV
 
 from backend.schema.cqGen import CQOutput
 
-load_dotenv()
+# The prompt takes no variables, so render it once at import
+CQ_INSTRUCTION = ENV.get_template("cqs_variant1.jinja2").render()
 
-PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../../../prompts/")
-ENV = Environment(loader=FileSystemLoader(PROMPT_DIR))
+_cq_agent = None
 
 
-async def get_cq_agent():
-    cq_template = ENV.get_template("cqs_variant1.jinja2")
-
-    clarifyingQuestionGenerator = Agent(
+def build_cq_agent():
+    return Agent(
         model='gemini-2.5-flash',
         name='clarifying_question_generator',
         description='An agent that generates clarifying questions, given an user query.',
-        instruction=cq_template.render(),
+        instruction=CQ_INSTRUCTION,
         output_schema=CQOutput,
         # instruction=template,
     )
-    return clarifyingQuestionGenerator
+
+
+def get_cq_agent():
+    """Return the clarifying question agent, building it on first use."""
+    global _cq_agent
+    if _cq_agent is None:
+        _cq_agent = build_cq_agent()
+    return _cq_agent
@@ -1,16 +1,11 @@
 import asyncio
-import json
-import os
-import sys
+import uuid
+import orjson
 from typing import Dict, Any, List, Optional
-# Define constants for paths
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-if PROJECT_ROOT not in sys.path:
-    sys.path.insert(0, PROJECT_ROOT)
 
-from backend.adk.assembly.run import _call_agent_async
+from backend.adk.assembly.run import _call_agent_async, _session_run
 from backend.adk.agents.clar_q_gen.agent import get_cq_agent
-from backend.schema.cqGen import ClarifyingQuestion, CQOutput
+from backend.schema.cqGen import CQ_LIST_ADAPTER, CQOutput
 
 
 def format_question(question_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -40,25 +35,28 @@ async def generate_clarifying_questions(query: str) -> CQOutput:
     Returns:
         CQOutput instance with original query and list of formatted questions
     """
-    cq_agent = await get_cq_agent()
+    cq_agent = get_cq_agent()
+    # CQ generation happens before the app assigns a session id; use a throwaway
+    # one so unrelated queries never share the default session's history
+    session_id = f"cq-{uuid.uuid4().hex}"
 
     try:
         # Use async generator to get response
         agent_name, response = None, None
-        async for name, text in _call_agent_async(query, cq_agent):
-            agent_name, response = name, text
+        async with _session_run(session_id):
+            async for name, text in _call_agent_async(query, cq_agent, session_id=session_id):
+                agent_name, response = name, text
 
-        cq_data = json.loads(response)
-        questions = [
-            ClarifyingQuestion(**format_question(cq))
-            for cq in cq_data.get('clarifying_questions', [])
-        ]
+        cq_data = orjson.loads(response)
+        questions = CQ_LIST_ADAPTER.validate_python(
+            [format_question(cq) for cq in cq_data.get('clarifying_questions', [])]
+        )
 
         return CQOutput(
             query=cq_data.get('query', query),
             clarifying_questions=questions
         )
-    except (json.JSONDecodeError, KeyError) as e:
+    except (orjson.JSONDecodeError, KeyError) as e:
         print(f"Error processing agent response: {e}")
         raise
     except Exception as e:
@@ -68,4 +66,4 @@ async def generate_clarifying_questions(query: str) -> CQOutput:
 if __name__ == "__main__":
     test_query = "Suggest places to visit in Europe in summer"
     result = asyncio.run(generate_clarifying_questions(test_query))
-    print(json.dumps(result, indent=2))
+    print(result.model_dump_json(indent=2))
@@ -1,25 +1,19 @@
-import os
-from pathlib import Path
 from google.adk.agents.llm_agent import Agent
-from jinja2 import Environment, FileSystemLoader
+from backend.adk.agents._jinja import ENV
 from backend.adk.tools.intent_classifier import check_clarification_status_callback
 from backend.schema.intentClassifier import IntentClassificationOutput
-from dotenv import load_dotenv
 
-load_dotenv()
 
+# The prompt takes no variables, so render it once at import
+IC_INSTRUCTION = ENV.get_template('intent_classification.jinja2').render()
 
-# Setup Jinja2 environment - point to prompts directory
-# Path is: agents/intent_classification -> agents -> adk -> backend -> prompts
-prompts_dir = Path(__file__).parent.parent.parent.parent / 'prompts'
-file_loader = FileSystemLoader(str(prompts_dir))
-env = Environment(loader=file_loader)
-cq_template = env.get_template('intent_classification.jinja2')
 
+_ic_agent = None
 
-async def get_ic_agent():
+
+def build_ic_agent():
     """
-    Initialize and return the Intent Classification agent with callback
+    Build a new Intent Classification agent with callback
 
     Returns:
         Configured Agent instance with before_model_callback
@@ -28,7 +22,7 @@ async def get_ic_agent():
         model='gemini-2.5-flash',
         name='intent_classification',
         description='An agent that generates user travel intents from the user query + clarifying questions.',
-        instruction=cq_template.render(),
+        instruction=IC_INSTRUCTION,
         output_schema=IntentClassificationOutput,
         before_model_callback=check_clarification_status_callback
     )
@@ -36,4 +30,17 @@ async def get_ic_agent():
     print(f"[Agent Init] Intent Classifier initialized")
     print(f"[Agent Init] Callback attached: {intentClassifierAgent.before_model_callback is not None}")
 
-    return intentClassifierAgent
\ No newline at end of file
+    return intentClassifierAgent
+
+
+def get_ic_agent():
+    """
+    Return the Intent Classification agent, building it on first use.
+
+    Use build_ic_agent() when the agent is going to be attached to a parent,
+    since ADK agents can only have one.
+    """
+    global _ic_agent
+    if _ic_agent is None:
+        _ic_agent = build_ic_agent()
+    return _ic_agent
@@ -1,27 +1,23 @@
 from google.adk.agents.llm_agent import Agent
-from jinja2 import Environment, FileSystemLoader
-from dotenv import load_dotenv
-import os
+from backend.adk.agents._jinja import ENV
 from functools import partial
 from backend.adk.tools.recsys import recsys_callback
 from constants import CITIES
 
-load_dotenv()
+from backend.schema.recSys import RecsysOutput
 
-PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../../../prompts/")
-ENV = Environment(loader=FileSystemLoader(PROMPT_DIR))
 
-from backend.schema.recSys import RecsysOutput
+# Both variants only depend on the static city catalog, so render them once at import
+RECSYS_INSTRUCTIONS = {
+    True: ENV.get_template("rec_with_context.jinja2").render(city_catalog=CITIES),
+    False: ENV.get_template("rec_baseline.jinja2").render(city_catalog=CITIES),
+}
+
+_recsys_agents = {}
 
 
-async def get_recsys_agent(has_context: bool = False):
-    if has_context:
-        file_name = "rec_with_context.jinja2"
-    else:
-        file_name = "rec_baseline.jinja2"
-    template = ENV.get_template(file_name).render(
-    city_catalog=CITIES
-)
+def build_recsys_agent(has_context: bool = False):
+    template = RECSYS_INSTRUCTIONS[has_context]
     # Create callback with has_context bound to it
     callback_with_context = partial(recsys_callback, has_context=has_context)
 
@@ -34,3 +30,10 @@ async def get_recsys_agent(has_context: bool = False):
         before_model_callback=callback_with_context
     )
     return recsys_agent
+
+
+def get_recsys_agent(has_context: bool = False):
+    """Return the baseline or context-aware recsys agent, building each on first use."""
+    if has_context not in _recsys_agents:
+        _recsys_agents[has_context] = build_recsys_agent(has_context)
+    return _recsys_agents[has_context]
@@ -1,29 +1,23 @@
 import asyncio
+from typing import Optional
 
 from google.adk.agents import ParallelAgent, LlmAgent, SequentialAgent
 import os
 import sys
-from jinja2 import Environment, FileSystemLoader
-from dotenv import load_dotenv
-from backend.adk.agents.intent_classification.agent import get_ic_agent
-from backend.adk.agents.recsys.agent import get_recsys_agent
-from backend.adk.agents.clar_q_gen.agent import get_cq_agent
-from backend.adk.agents.cfe.agent import get_cfe_agent
+from backend.adk.agents.intent_classification.agent import build_ic_agent
+from backend.adk.agents.recsys.agent import build_recsys_agent
+# Rendered once at import of the CFE agent module; shared so the prompt is only built once
+from backend.adk.agents.cfe.agent import CFE_INSTRUCTION
+from backend.adk.tools.cfe import skip_if_clarification_incomplete
 from backend.schema.cfe import CFEOutput
 
-load_dotenv()
 
-PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../../prompts/")
-ENV = Environment(loader=FileSystemLoader(PROMPT_DIR))
-
-
-async def create_pipeline():
+def create_pipeline():
     """Initialize and return the root agent pipeline."""
-    ic_agent, rec_baseline_agent, ca_recsys_agent = await asyncio.gather(
-        get_ic_agent(),
-        get_recsys_agent(has_context=False),
-        get_recsys_agent(has_context=True)
-    )
+    # Fresh sub-agents: the memoized standalone agents may not be re-parented
+    ic_agent = build_ic_agent()
+    rec_baseline_agent = build_recsys_agent(has_context=False)
+    ca_recsys_agent = build_recsys_agent(has_context=True)
 
     sequential_pipeline = SequentialAgent(
         name="SequentialPipeline",
@@ -40,9 +34,11 @@ async def create_pipeline():
     merger_agent = LlmAgent(
         name="CFEAgent",
         model='gemini-2.5-flash',
-        instruction=ENV.get_template("cfe_combination.jinja2").render(),
+        instruction=CFE_INSTRUCTION,
         description="This is the CFE agent combining the outputs of multiple agents.",
-        output_schema=CFEOutput
+        output_schema=CFEOutput,
+        # Skips the merge when the intent classifier stopped on incomplete clarification
+        before_model_callback=skip_if_clarification_incomplete
     )
 
     overall_workflow = SequentialAgent(
@@ -54,6 +50,14 @@ async def create_pipeline():
     return overall_workflow
 
 
+_root_agent: Optional[SequentialAgent] = None
+_root_agent_lock = asyncio.Lock()
+
+
 async def get_root_agent():
-    """Async wrapper to get the root agent."""
-    return await create_pipeline()
+    """Return the root agent pipeline, building it once on first use."""
+    global _root_agent
+    async with _root_agent_lock:
+        if _root_agent is None:
+            _root_agent = create_pipeline()
+    return _root_agent
@@ -1,26 +1,41 @@
 from google.adk.agents.llm_agent import Agent
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.runners import Runner
-from typing import Optional, Dict, Union, List
+from typing import AsyncIterator, Optional, Dict, Union, List, Tuple
 from google.genai import types
 from google.adk.sessions import InMemorySessionService
+from contextlib import asynccontextmanager
 import asyncio
-from dotenv import load_dotenv
 import os
-import json
 from backend.schema.cfe import (
     CFEOutput
 )
 from backend.schema.recSys import RecsysOutput
 from backend.schema.intentClassifier import IntentClassificationOutput
-
-load_dotenv()
+from backend.adk.tools.intent_classifier import CLARIFICATION_INCOMPLETE_STATE_KEY
+from backend.adk.tools.utils import firestore_read_cache
 
 APP_NAME = "crs-chat_app"
 USER_ID = "user_1"
 SESSION_ID = "session_001"
 
 
+_CLARIFICATION_INCOMPLETE_MESSAGE = (
+    "Clarification is not complete; answer all clarifying questions before running the pipeline."
+)
+
+
+class ClarificationIncompleteError(RuntimeError):
+    """The pipeline skipped the CFE step because the session's clarification is not complete."""
+
 # Session and Runner
+# One session service for the process, and one Runner per agent instance (agents are memoized)
+_SESSION_SERVICE = InMemorySessionService()
+_RUNNERS: Dict[int, Runner] = {}
+# Per session id: the lock held by the run using it, and how many runs hold or wait for it
+_SESSION_LOCKS: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+
 async def _setup_session_and_runner(root_agent: Agent = None, session_id: str = SESSION_ID):
     """
     Setup ADK session and runner
@@ -29,12 +44,23 @@ async def _setup_session_and_runner(root_agent: Agent = None, session_id: str =
         root_agent: The agent to run
         session_id: Session identifier (defaults to SESSION_ID constant)
     """
-    session_service = InMemorySessionService()
-    session = await session_service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
-    runner = Runner(agent=root_agent, app_name=APP_NAME, session_service=session_service)
+    runner = _RUNNERS.get(id(root_agent))
+    if runner is None:
+        runner = Runner(agent=root_agent, app_name=APP_NAME, session_service=_SESSION_SERVICE)
+        _RUNNERS[id(root_agent)] = runner
+
+    # Every run starts from an empty session, so earlier turns never leak into the model context;
+    # a session left behind by a run that was not cleaned up is replaced
+    await _runner_cleanup(session_id)
+    session = await _SESSION_SERVICE.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
     return session, runner
 
 
+def _make_user_content(query: str) -> types.Content:
+    """Wrap the query text as a single-part user message for the runner."""
+    return types.Content(role='user', parts=[types.Part(text=query)])
+
+
 # Agent Interaction
 async def _call_agent_async(query: str, root_agent: Agent = None, session_id: str = SESSION_ID):
     """
@@ -48,17 +74,60 @@ async def _call_agent_async(query: str, root_agent: Agent = None, session_id: st
     Returns:
         Tuple of (agent_name, response_text)
     """
-    content = types.Content(role='user', parts=[types.Part(text=query)])
+    content = _make_user_content(query)
     session, runner = await _setup_session_and_runner(root_agent=root_agent, session_id=session_id)
     events = runner.run_async(user_id=USER_ID, session_id=session_id, new_message=content)
 
-    async for event in events:
-        if event.is_final_response():
-            if event.content is None or not event.content.parts:
-                error_msg = getattr(event, 'error_message', None) or "Agent returned no content (possible API key or quota error)"
-                raise RuntimeError(error_msg)
-            final_response = event.content.parts[0].text
-            yield event.author, final_response
+    try:
+        async for event in events:
+            if event.is_final_response():
+                if event.content is None or not event.content.parts:
+                    error_msg = getattr(event, 'error_message', None) or "Agent returned no content (possible API key or quota error)"
+                    raise RuntimeError(error_msg)
+                final_response = event.content.parts[0].text
+                yield event.author, final_response
+    finally:
+        # Stop the runner right away if the caller breaks out early, instead of at GC
+        await events.aclose()
+
+
+async def _clarification_incomplete(session_id: str) -> bool:
+    """Whether the intent classifier flagged this run's clarification as incomplete."""
+    session = await _SESSION_SERVICE.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    return session is not None and session.state.get(CLARIFICATION_INCOMPLETE_STATE_KEY, False)
+
+
+async def _runner_cleanup(session_id: str = SESSION_ID):
+    """Delete a finished session so the in-memory session service does not grow unbounded."""
+    session = await _SESSION_SERVICE.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    if session is not None:
+        await _SESSION_SERVICE.delete_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+
+
+@asynccontextmanager
+async def _session_run(session_id: str = SESSION_ID):
+    """
+    Reserve a session id for one run, from session setup through cleanup.
+
+    Runs sharing a session id share one ADK session, so they are serialized;
+    otherwise one run's setup or cleanup deletes the session under the other.
+    """
+    lock, users = _SESSION_LOCKS.get(session_id, (None, 0))
+    if lock is None:
+        lock = asyncio.Lock()
+    _SESSION_LOCKS[session_id] = (lock, users + 1)
+    try:
+        async with lock:
+            try:
+                yield
+            finally:
+                await _runner_cleanup(session_id)
+    finally:
+        lock, users = _SESSION_LOCKS[session_id]
+        if users == 1:
+            del _SESSION_LOCKS[session_id]
+        else:
+            _SESSION_LOCKS[session_id] = (lock, users - 1)
 
 
 async def get_model_response(
@@ -79,27 +148,109 @@ async def get_model_response(
     Returns:
         If return_cfe_only is True: CFEOutput object
         Otherwise: List of response dictionaries with agent_name and response_text
+
+    Raises:
+        ClarificationIncompleteError: If return_cfe_only is True and the pipeline
+            skipped the CFE step because clarification is incomplete
     """
     responses = []
-    async for agent_name, response_text in _call_agent_async(query, root_agent, session_id):
-        response_dict = {
-            "agent_name": agent_name,
-            "response_text": response_text
-        }
-        responses.append(response_dict)
+    async with _session_run(session_id):
+        # Pipeline callbacks read overlapping session documents; fetch each one once per run
+        with firestore_read_cache():
+            async for agent_name, response_text in _call_agent_async(query, root_agent, session_id):
+                response_dict = {
+                    "agent_name": agent_name,
+                    "response_text": response_text
+                }
+                responses.append(response_dict)
+        # Read before cleanup drops the session
+        clarification_incomplete = await _clarification_incomplete(session_id)
 
     if return_cfe_only:
+        if clarification_incomplete:
+            # The CFE step answered with a plain-text notice instead of a CFEOutput
+            raise ClarificationIncompleteError(_CLARIFICATION_INCOMPLETE_MESSAGE)
         # Filter for CFE agent response
         cfe_responses = [r for r in responses if r["agent_name"] == "CFEAgent"]
         if cfe_responses:
-            # Parse and return as CFEOutput object
-            response_data = json.loads(cfe_responses[0]["response_text"])
-            return CFEOutput(**response_data)
+            # Parse and validate in one pass, without an intermediate dict
+            return CFEOutput.model_validate_json(cfe_responses[0]["response_text"])
         return None
 
     return responses
 
 
+_STREAMING_RUN_CONFIG = RunConfig(streaming_mode=StreamingMode.SSE)
+
+
+async def get_model_response_stream(
+        query: str,
+        root_agent: Agent,
+        session_id: Optional[str] = SESSION_ID,
+        agent_name: str = "CFEAgent"
+) -> AsyncIterator[str]:
+    """
+    Stream one agent's response text from the pipeline as it is decoded.
+
+    Args:
+        query: User query text
+        root_agent: The agent to invoke
+        session_id: Session identifier
+        agent_name: Agent whose output is streamed (defaults to the CFE agent)
+
+    Yields:
+        Text chunks of the agent's response. If the model did not stream (e.g. a
+        callback answered directly), the final response is yielded as one chunk.
+
+    Raises:
+        ClarificationIncompleteError: If the pipeline skipped the CFE step
+            because clarification is incomplete
+    """
+    async with _session_run(session_id):
+        # Pipeline callbacks read overlapping session documents; fetch each one once per run
+        with firestore_read_cache():
+            content = _make_user_content(query)
+            session, runner = await _setup_session_and_runner(root_agent=root_agent, session_id=session_id)
+            events = runner.run_async(
+                user_id=USER_ID, session_id=session_id, new_message=content, run_config=_STREAMING_RUN_CONFIG
+            )
+
+            streamed = False
+            checked_clarification = False
+            try:
+                async for event in events:
+                    if event.author != agent_name:
+                        continue
+                    if not checked_clarification:
+                        # The intent classifier has finished by now; don't stream the skip notice as output
+                        checked_clarification = True
+                        if await _clarification_incomplete(session_id):
+                            raise ClarificationIncompleteError(_CLARIFICATION_INCOMPLETE_MESSAGE)
+                    if event.content is None or not event.content.parts:
+                        if event.is_final_response():
+                            error_msg = getattr(event, 'error_message', None) or "Agent returned no content (possible API key or quota error)"
+                            raise RuntimeError(error_msg)
+                        continue
+                    text = event.content.parts[0].text
+                    if not text:
+                        continue
+                    if event.partial:
+                        streamed = True
+                        yield text
+                    elif event.is_final_response() and not streamed:
+                        # The final event repeats the full text of the streamed chunks
+                        yield text
+            finally:
+                await events.aclose()
+
+
+_RESPONSE_MODELS = {
+    "intent_classification": IntentClassificationOutput,
+    "recsys": RecsysOutput,
+    "CFEAgent": CFEOutput,
+}
+
+
 async def get_parsed_responses(
         query: str,
         root_agent: Agent,
@@ -116,13 +267,9 @@ async def get_parsed_responses(
 
     for response in responses:
         agent_name = response["agent_name"]
-        response_data = json.loads(response["response_text"])
-
-        if agent_name == "intent_classification":
-            parsed_responses[agent_name] = IntentClassificationOutput(**response_data)
-        elif agent_name == "recsys":
-            parsed_responses[agent_name] = RecsysOutput(**response_data)
-        elif agent_name == "CFEAgent":
-            parsed_responses[agent_name] = CFEOutput(**response_data)
+        model = _RESPONSE_MODELS.get(agent_name)
+        if model is not None:
+            # Parse and validate in one pass, without an intermediate dict
+            parsed_responses[agent_name] = model.model_validate_json(response["response_text"])
 
     return parsed_responses
@@ -1,11 +1,26 @@
+import logging
 from typing import Optional
 
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models import LlmRequest, LlmResponse
 from google.genai import types
 
-from backend.adk.tools.utils import get_firestore_document, inject_to_llm_request
-import json
+from backend.adk.tools.intent_classifier import CLARIFICATION_INCOMPLETE_STATE_KEY
+from backend.adk.tools.utils import get_firestore_documents, inject_to_llm_request
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_CONTEXT_COLLECTIONS = (
+    'intent_classifier_responses',
+    'context_aware_recommendations',
+    'baseline_recommendations',
+)
+_CONTEXT_ERROR_MESSAGES = {
+    'intent_classifier_responses': "Error: Intent classification data not found. Please run intent classifier first.",
+    'context_aware_recommendations': "Error: Content aware recommendations data not found. Please run CA recommendations first.",
+    'baseline_recommendations': "Error: Content aware recommendations data not found. Please run CA recommendations first.",
+}
 
 
 def _format_context_as_text(intent_data: dict, ca_rec_data: dict, rec_base_data: dict) -> str:
@@ -27,47 +42,40 @@ def _format_context_as_text(intent_data: dict, ca_rec_data: dict, rec_base_data:
     }
     return f"""
 === CONTEXT DATA (Include this in your 'context' field) ===
-{json.dumps(context_obj, indent=2)}
+{orjson.dumps(context_obj, option=orjson.OPT_INDENT_2).decode()}
 === END CONTEXT DATA ===
 """
 
 
-def cfe_callback(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
-    print(f"[CFE Callback] Invoked for agent: {callback_context.agent_name}")
+async def cfe_callback(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    logger.debug("[CFE Callback] Invoked for agent: %s", callback_context.agent_name)
 
     session_id = callback_context.session.id
 
     if not session_id:
-        print("[CFE Callback] WARNING: Could not extract session_id.")
+        logger.warning("[CFE Callback] Could not extract session_id.")
         return None
 
-    print(f"[CFE Callback] Checking Firestore for session: {session_id}")
+    logger.debug("[CFE Callback] Checking Firestore for session: %s", session_id)
     error = None
     try:
-        intent_data, error_response_0 = get_firestore_document(
-            collection_name='intent_classifier_responses',
+        # The three lookups are independent, so fetch them in a single batched read
+        docs, error = await get_firestore_documents(
+            collection_names=_CONTEXT_COLLECTIONS,
             session_id=session_id,
-            error_message="Error: Intent classification data not found. Please run intent classifier first.",
+            error_messages=_CONTEXT_ERROR_MESSAGES,
             log_prefix="[CFE Callback]"
         )
 
-        ca_rec_data, error_response_1 = get_firestore_document(
-            collection_name='context_aware_recommendations',
-            session_id=session_id,
-            error_message="Error: Content aware recommendations data not found. Please run CA recommendations first.",
-            log_prefix="[CFE Callback]"
-        )
-        rec_base_data, error_response_2 = get_firestore_document(
-            collection_name='baseline_recommendations',
-            session_id=session_id,
-            error_message="Error: Content aware recommendations data not found. Please run CA recommendations first.",
-            log_prefix="[CFE Callback]")
-
-        if error := (error_response_0 or error_response_1 or error_response_2):
+        if error:
             return error
 
+        intent_data = docs['intent_classifier_responses']
+        ca_rec_data = docs['context_aware_recommendations']
+        rec_base_data = docs['baseline_recommendations']
+
         if not intent_data or not ca_rec_data or not rec_base_data:
-            print(f"[CFE Callback] Empty data for session {session_id}.")
+            logger.warning("[CFE Callback] Empty data for session %s.", session_id)
             return None
 
         # 4. Format context as text
@@ -76,15 +84,13 @@ def cfe_callback(callback_context: CallbackContext, llm_request: LlmRequest) ->
         # 5. Inject into LLM request
         inject_to_llm_request(context_text, llm_request)
 
-        print("[CFE Callback] Successfully injected context into LLM request.")
+        logger.debug("[CFE Callback] Successfully injected context into LLM request.")
         return None  # Proceed with modified request
 
     except Exception as e:
-        # Note: Firestore errors are already handled by get_firestore_document()
+        # Note: Firestore errors are already handled by get_firestore_documents()
         # This catches any other unexpected errors in the callback logic
-        print(f"[Recsys Callback] Error in callback logic: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("[CFE Callback] Error in callback logic: %s", e)
 
         return LlmResponse(
             content=types.Content(
@@ -92,3 +98,23 @@ def cfe_callback(callback_context: CallbackContext, llm_request: LlmRequest) ->
                 parts=[types.Part(text=f"Error retrieving intent context: {str(e)}")]
             )
         )
+
+
+async def skip_if_clarification_incomplete(
+        callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """
+    Callback for the pipeline's CFE step. When the intent classifier found the
+    clarification incomplete there is nothing to combine, so answer directly
+    instead of calling the model.
+    """
+    if not callback_context.state.get(CLARIFICATION_INCOMPLETE_STATE_KEY, False):
+        return None
+
+    logger.info("[CFE Callback] Clarification INCOMPLETE. Skipping Model execution.")
+    return LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[types.Part(text="Please complete all clarification questions before generating recommendations.")]
+        )
+    )
@@ -1,3 +1,4 @@
+import logging
 from typing import Optional
 from google.genai import types
 from google.adk.agents.callback_context import CallbackContext
@@ -5,8 +6,13 @@ from google.adk.models import LlmResponse, LlmRequest
 
 from backend.adk.tools.utils import inject_to_llm_request, format_clarification_as_text, get_firestore_document
 
+logger = logging.getLogger(__name__)
 
-def check_clarification_status_callback(
+# Session state flag read by the pipeline's CFE step to skip its model call
+CLARIFICATION_INCOMPLETE_STATE_KEY = "clarification_incomplete"
+
+
+async def check_clarification_status_callback(
         callback_context: CallbackContext, llm_request: LlmRequest
 ) -> Optional[LlmResponse]:
     """
@@ -14,20 +20,20 @@ def check_clarification_status_callback(
     Blocks execution if 'clarification_complete' is False or missing.
     If complete, injects the query + Q&A data into the request.
     """
-    print(f"[Callback] Invoked for agent: {callback_context.agent_name}")
+    logger.debug("[Callback] Invoked for agent: %s", callback_context.agent_name)
 
     # Extract session_id
     session_id = callback_context.session.id
 
     if not session_id:
-        print("[Callback] WARNING: Could not extract session_id.")
+        logger.warning("[Callback] Could not extract session_id.")
         return None
 
-    print(f"[Callback] Checking Firestore for session: {session_id}")
+    logger.debug("[Callback] Checking Firestore for session: %s", session_id)
 
     try:
         # 1. Retrieve conversation document from Firestore
-        doc, error_response = get_firestore_document(
+        doc, error_response = await get_firestore_document(
             collection_name='conversations',
             session_id=session_id,
             error_message="Error: Conversation not found. Please complete clarification first.",
@@ -42,8 +48,9 @@ def check_clarification_status_callback(
         clarification_complete = clarification_data_raw.get('clarification_complete', False)
 
         # 4. Decision Logic
+        callback_context.state[CLARIFICATION_INCOMPLETE_STATE_KEY] = not clarification_complete
         if not clarification_complete:
-            print("[Callback] Clarification INCOMPLETE. Skipping Model execution.")
+            logger.info("[Callback] Clarification INCOMPLETE. Skipping Model execution.")
             return LlmResponse(
                 content=types.Content(
                     role="model",
@@ -52,9 +59,9 @@ def check_clarification_status_callback(
             )
 
         # 5. Clarification is complete - extract and inject data
-        print("[Callback] Clarification complete. Injecting clarification data into request.")
+        logger.debug("[Callback] Clarification complete. Injecting clarification data into request.")
         if not clarification_data_raw:
-            print("[Callback] WARNING: Clarification marked complete but no data found.")
+            logger.warning("[Callback] Clarification marked complete but no data found.")
             return None  # Proceed without injection
 
         # 6. Format clarification data as text
@@ -62,15 +69,13 @@ def check_clarification_status_callback(
 
         inject_to_llm_request(clarification_text, llm_request) # in-place modification happens
 
-        print("[Callback] Proceeding to Model with injected clarification data.")
+        logger.debug("[Callback] Proceeding to Model with injected clarification data.")
         return None  # Proceed with modified LLM call
 
     except Exception as e:
         # Note: Firestore errors are already handled by get_firestore_document()
         # This catches any other unexpected errors in the callback logic
-        print(f"[Callback] Error in callback logic: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("[Callback] Error in callback logic: %s", e)
         return LlmResponse(
             content=types.Content(
                 role="model",
@@ -1,15 +1,40 @@
-from typing import Optional, Tuple
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
 from google.adk.models import LlmRequest, LlmResponse
 from google.genai import types
 
-from utils.firestore_utils import get_firestore_client
+from utils.firestore_utils import get_async_firestore_client
 
+logger = logging.getLogger(__name__)
 
-def get_firestore_document(
+# Documents already read during the current request, keyed by (collection, session_id).
+# None outside of firestore_read_cache(), so standalone calls always hit Firestore.
+_request_doc_cache: ContextVar[Optional[Dict[Tuple[str, str], dict]]] = ContextVar("_request_doc_cache", default=None)
+
+
+@contextmanager
+def firestore_read_cache():
+    """
+    Share Firestore document reads between all callbacks run inside this block.
+
+    Only safe around work that does not write the cached collections: the ADK
+    pipeline callbacks only read them, and the endpoints ingest outside the block.
+    """
+    token = _request_doc_cache.set({})
+    try:
+        yield
+    finally:
+        _request_doc_cache.reset(token)
+
+
+async def get_firestore_document(
     collection_name: str,
     session_id: str,
     error_message: str,
-    log_prefix: str = "[Callback]"
+    log_prefix: str = "[Callback]",
+    force_refresh: bool = False
 ) -> Tuple[Optional[dict], Optional[LlmResponse]]:
     """
     Retrieve a document from Firestore by collection name and session ID.
@@ -19,22 +44,29 @@ def get_firestore_document(
         session_id: Document ID (session identifier)
         error_message: Error message to return if document not found
         log_prefix: Prefix for log messages (default: "[Callback]")
+        force_refresh: Skip the per-request read cache and always query Firestore
 
     Returns:
         Tuple of (document_data, error_response):
         - If successful: (document_dict, None)
         - If document not found or error: (None, LlmResponse with error)
     """
+    cache = _request_doc_cache.get()
+    if cache is not None and not force_refresh:
+        cached = cache.get((collection_name, session_id))
+        if cached is not None:
+            return cached, None
+
     try:
         # Get Firestore client
-        db = get_firestore_client()
+        db = get_async_firestore_client()
 
         # Retrieve document
         doc_ref = db.collection(collection_name).document(session_id)
-        doc_snapshot = doc_ref.get()
+        doc_snapshot = await doc_ref.get()
 
         if not doc_snapshot.exists:
-            print(f"{log_prefix} Document not found in {collection_name} for session {session_id}.")
+            logger.warning("%s Document not found in %s for session %s.", log_prefix, collection_name, session_id)
             return None, LlmResponse(
                 content=types.Content(
                     role="model",
@@ -44,17 +76,82 @@ def get_firestore_document(
 
         # Convert to dict
         doc_data = doc_snapshot.to_dict()
+        if cache is not None:
+            cache[(collection_name, session_id)] = doc_data
         return doc_data, None
 
     except Exception as e:
-        print(f"{log_prefix} Error retrieving document from {collection_name}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("%s Error retrieving document from %s: %s", log_prefix, collection_name, e)
+
+        return None, LlmResponse(
+            content=types.Content(
+                role="model",
+                parts=[types.Part(text=f"Error retrieving data from {collection_name}.")]
+            )
+        )
+
+
+async def get_firestore_documents(
+    collection_names: Sequence[str],
+    session_id: str,
+    error_messages: Dict[str, str],
+    log_prefix: str = "[Callback]"
+) -> Tuple[Optional[Dict[str, dict]], Optional[LlmResponse]]:
+    """
+    Retrieve the session's document from several Firestore collections in one batched read.
+
+    Args:
+        collection_names: Names of the Firestore collections to read
+        session_id: Document ID (session identifier), shared by all collections
+        error_messages: Error message per collection, returned if its document is not found
+        log_prefix: Prefix for log messages (default: "[Callback]")
+
+    Returns:
+        Tuple of (documents, error_response):
+        - If successful: ({collection_name: document_dict}, None)
+        - If a document is not found or error: (None, LlmResponse with error)
+    """
+    cache = _request_doc_cache.get()
+    docs = {}
+    if cache is not None:
+        for name in collection_names:
+            cached = cache.get((name, session_id))
+            if cached is not None:
+                docs[name] = cached
+
+    try:
+        missing = [name for name in collection_names if name not in docs]
+        if missing:
+            db = get_async_firestore_client()
+            doc_refs = [db.collection(name).document(session_id) for name in missing]
+
+            # One BatchGetDocuments RPC; snapshots may come back in any order
+            async for doc_snapshot in db.get_all(doc_refs):
+                if doc_snapshot.exists:
+                    name = doc_snapshot.reference.parent.id
+                    docs[name] = doc_snapshot.to_dict()
+                    if cache is not None:
+                        cache[(name, session_id)] = docs[name]
+
+        for name in collection_names:
+            if name not in docs:
+                logger.warning("%s Document not found in %s for session %s.", log_prefix, name, session_id)
+                return None, LlmResponse(
+                    content=types.Content(
+                        role="model",
+                        parts=[types.Part(text=error_messages[name])]
+                    )
+                )
+
+        return docs, None
+
+    except Exception as e:
+        logger.exception("%s Error retrieving documents from %s: %s", log_prefix, ", ".join(collection_names), e)
 
         return None, LlmResponse(
             content=types.Content(
                 role="model",
-                parts=[types.Part(text=f"Error retrieving data from {collection_name}: {str(e)}")]
+                parts=[types.Part(text=f"Error retrieving data from {', '.join(collection_names)}.")]
             )
         )
 
@@ -72,14 +169,12 @@ def format_clarification_as_text(clarification_data: dict) -> str:
     query = clarification_data.get('query', '')
     questions = clarification_data.get('clarifying_questions', [])
 
-    formatted = f"User's Original Query: {query}\n\n"
-    formatted += "Clarifying Questions and Answers:\n"
-
-    for q in questions:
-        formatted += f"\nQ{q['id']}: {q['question']}\n"
-        formatted += f"Answer: {q.get('answer', 'No answer provided')}\n"
-
-    return formatted
+    parts = [f"User's Original Query: {query}\n\n", "Clarifying Questions and Answers:\n"]
+    parts.extend(
+        f"\nQ{q['id']}: {q['question']}\nAnswer: {q.get('answer', 'No answer provided')}\n"
+        for q in questions
+    )
+    return "".join(parts)
 
 
 def format_intent_context_as_text(intent_data: dict) -> str:
@@ -92,64 +187,67 @@ def format_intent_context_as_text(intent_data: dict) -> str:
     Returns:
         Formatted string representation with all context
     """
-    formatted = "=== User Context and Intent ===\n\n"
+    parts = ["=== User Context and Intent ===\n\n"]
 
     # 1. Input data (clarified Q&A and queries)
-    input_data = intent_data.get('input', [])
+    input_data = intent_data.get('input_data', intent_data.get('input', []))
     if input_data:
-        formatted += "## Clarified User Queries:\n"
+        parts.append("## Clarified User Queries:\n")
         for idx, context in enumerate(input_data, 1):
-            query = context.get('user query', context.get('user_query', ''))
-            formatted += f"\n### Query {idx}: {query}\n"
+            query = context.get('user_query', context.get('user query', ''))
+            parts.append(f"\n### Query {idx}: {query}\n")
 
-            clarified_qa = context.get('clarified Q&A', context.get('clarified_qa', []))
+            clarified_qa = context.get('clarified_qa', context.get('clarified Q&A', []))
             if clarified_qa:
-                formatted += "Clarifying Questions & Answers:\n"
-                for q in clarified_qa:
-                    formatted += f"  - Q{q.get('id', '')} [{q.get('category', 'N/A')}]: {q.get('question', '')}\n"
-                    formatted += f"    Answer: {q.get('answer', 'No answer provided')}\n"
+                parts.append("Clarifying Questions & Answers:\n")
+                parts.extend(
+                    f"  - Q{q.get('id', '')} [{q.get('category', 'N/A')}]: {q.get('question', '')}\n"
+                    f"    Answer: {q.get('answer', 'No answer provided')}\n"
+                    for q in clarified_qa
+                )
 
     # 2. User travel persona
     persona = intent_data.get('user_travel_persona', '')
     if persona:
-        formatted += f"\n## User Travel Persona:\n{persona}\n"
+        parts.append(f"\n## User Travel Persona:\n{persona}\n")
 
     # 3. Travel intent
     travel_intent = intent_data.get('travel_intent', '')
     if travel_intent:
-        formatted += f"\n## Travel Intent:\n{travel_intent}\n"
+        parts.append(f"\n## Travel Intent:\n{travel_intent}\n")
 
     # 4. Compromise details
     compromise = intent_data.get('compromise', {})
     if compromise:
-        formatted += "\n## Compromise Flexibility:\n"
+        parts.append("\n## Compromise Flexibility:\n")
         willing = compromise.get('willing_to_compromise', False)
-        formatted += f"Willing to compromise: {'Yes' if willing else 'No'}\n"
+        parts.append(f"Willing to compromise: {'Yes' if willing else 'No'}\n")
 
         factors = compromise.get('compromise_factors', [])
         if factors:
-            formatted += f"Compromise factors: {', '.join(factors)}\n"
+            parts.append(f"Compromise factors: {', '.join(factors)}\n")
 
-    formatted += "\n=== End of Context ===\n\n"
-    return formatted
+    parts.append("\n=== End of Context ===\n\n")
+    return "".join(parts)
 
 
 def inject_to_llm_request(text: str, llm_request: LlmRequest):
     # Inject into the LLM request
-    if llm_request.contents and len(llm_request.contents) > 0:
-        # Find the last user message
-        for content in reversed(llm_request.contents):
-            if content.role == 'user':
-                # Prepend clarification data to the existing user message
-                data_part = types.Part(text=text)
-
-                # Insert at the beginning of the parts list
-                if content.parts:
-                    content.parts.insert(0, data_part)
-                else:
-                    content.parts = [data_part]
-
-                print(f"[Callback] Injected clarification data into user message.")
-                break
+    contents = llm_request.contents
+    if contents:
+        # Find the last user message; it is usually the last entry
+        i = len(contents) - 1
+        while i >= 0 and contents[i].role != 'user':
+            i -= 1
+
+        if i >= 0:
+            content = contents[i]
+            # Prepend clarification data to the existing user message
+            data_part = types.Part(text=text)
+
+            # Build the new parts list in one copy instead of shifting every part down
+            content.parts = [data_part, *(content.parts or ())]
+
+            logger.debug("[Callback] Injected clarification data into user message.")
 
     return llm_request
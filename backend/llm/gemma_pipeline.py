@@ -5,43 +5,44 @@ Data flow (mirrors the ADK SequentialAgent + ParallelAgent structure):
   1. generate_cq(query)          → CQOutput
   2. run_full_pipeline(session):
        a. read clarification data from store
-       b. intent_classifier           (sequential)
-       c. baseline_recsys + ca_recsys (parallel)
-       d. cfe_agent                   (combines all three)
+       b. intent_classifier + baseline_recsys (parallel)
+       c. ca_recsys                           (after intent_classifier)
+       d. cfe_agent                           (combines all three)
 """
 import asyncio
 import logging
-from pathlib import Path
+import re
 from typing import Any, Dict, List, Optional
 
-from jinja2 import Environment, FileSystemLoader
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import BaseModel
 
+from backend.adk.agents._jinja import ENV as _ENV
 from backend.llm.hf_runner import call_structured
 from backend.schema.cfe import CFEOutput
-from backend.schema.cqGen import ClarifyingQuestion, CQOutput
+from backend.schema.cqGen import CQ_LIST_ADAPTER, ClarifyingQuestion, CQOutput
+from backend.schema.intentClassifier import CompromiseDetails
 from backend.adk.tools.utils import format_clarification_as_text, format_intent_context_as_text
 from constants import CITIES
 
 logger = logging.getLogger(__name__)
 
-_PROMPT_DIR = Path(__file__).parent.parent / "prompts"
-_ENV = Environment(loader=FileSystemLoader(str(_PROMPT_DIR)))
+# System prompts only depend on static inputs, so render them once at import
+_CQ_PROMPT = _ENV.get_template("cqs_variant1.jinja2").render()
+_IC_PROMPT = _ENV.get_template("intent_classification.jinja2").render()
+_REC_BASELINE_PROMPT = _ENV.get_template("rec_baseline.jinja2").render(city_catalog=CITIES)
+_REC_CA_PROMPT = _ENV.get_template("rec_with_context.jinja2").render(city_catalog=CITIES)
+_CFE_PROMPT = _ENV.get_template("cfe_combination.jinja2").render()
 
 
 # ---------------------------------------------------------------------------
 # Lightweight intermediate schemas (no aliases — easier for Gemma to follow)
 # ---------------------------------------------------------------------------
 
-class _Compromise(BaseModel):
-    willing_to_compromise: bool
-    compromise_factors: List[str] = Field(default_factory=list)
-
-
 class _ICOutput(BaseModel):
     user_travel_persona: str
     travel_intent: str
-    compromise: _Compromise
+    compromise: CompromiseDetails  # alias-free, so shared with the ADK schema
 
 
 class _RecOutput(BaseModel):
@@ -79,6 +80,8 @@ _SCOPE_KEYWORDS = {
     "visit", "destination", "recommend", "suggest", "where", "break",
     "weekend", "tourism", "tour", "country",
 }
+# One alternation over all keywords, so the query is scanned once instead of once per keyword
+_SCOPE_KEYWORDS_RE = re.compile("|".join(map(re.escape, sorted(_SCOPE_KEYWORDS))))
 
 # Minimal fallback questions used when the model fails or incorrectly rejects a travel query
 _FALLBACK_QUESTIONS = [
@@ -97,13 +100,12 @@ _FALLBACK_QUESTIONS = [
 
 
 def _looks_like_travel_query(query: str) -> bool:
-    q = query.lower()
-    return any(kw in q for kw in _SCOPE_KEYWORDS)
+    return _SCOPE_KEYWORDS_RE.search(query.lower()) is not None
 
 
 async def generate_cq(query: str) -> CQOutput:
     """Step 0 (called by /generate-clarifying-questions): produce clarifying questions."""
-    system_prompt = _ENV.get_template("cqs_variant1.jinja2").render()
+    system_prompt = _CQ_PROMPT
     data: Optional[Dict[str, Any]] = None
     try:
         data = await call_structured(
@@ -118,7 +120,9 @@ async def generate_cq(query: str) -> CQOutput:
     if data is not None:
         data.setdefault("query", query)
         raw_qs = data.get("clarifying_questions", [])
-        questions = [ClarifyingQuestion(id=q["id"], question=q["question"]) for q in raw_qs]
+        questions = CQ_LIST_ADAPTER.validate_python(
+            [{"id": q["id"], "question": q["question"]} for q in raw_qs]
+        )
     else:
         questions = []
 
@@ -145,7 +149,7 @@ async def generate_cq(query: str) -> CQOutput:
 
 
 async def _run_ic(clarification_data: Dict[str, Any]) -> Dict[str, Any]:
-    system_prompt = _ENV.get_template("intent_classification.jinja2").render()
+    system_prompt = _IC_PROMPT
     context_text = format_clarification_as_text(clarification_data)
     return await call_structured(
         system_prompt=system_prompt,
@@ -156,7 +160,7 @@ async def _run_ic(clarification_data: Dict[str, Any]) -> Dict[str, Any]:
 
 
 async def _run_baseline_recsys(query: str) -> Dict[str, Any]:
-    system_prompt = _ENV.get_template("rec_baseline.jinja2").render(city_catalog=CITIES)
+    system_prompt = _REC_BASELINE_PROMPT
     return await call_structured(
         system_prompt=system_prompt,
         user_message=f"User query: {query}",
@@ -166,7 +170,7 @@ async def _run_baseline_recsys(query: str) -> Dict[str, Any]:
 
 
 async def _run_ca_recsys(query: str, ic_data: Dict[str, Any]) -> Dict[str, Any]:
-    system_prompt = _ENV.get_template("rec_with_context.jinja2").render(city_catalog=CITIES)
+    system_prompt = _REC_CA_PROMPT
     intent_context = format_intent_context_as_text(ic_data)
     return await call_structured(
         system_prompt=system_prompt,
@@ -177,7 +181,6 @@ async def _run_ca_recsys(query: str, ic_data: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def _format_cfe_context(ic_data: Dict, ca_data: Dict, baseline_data: Dict) -> str:
-    import json
     ctx = {
         "intent_classification": ic_data,
         "baseline_recommendation": {
@@ -193,13 +196,13 @@ def _format_cfe_context(ic_data: Dict, ca_data: Dict, baseline_data: Dict) -> st
     }
     return (
         "=== CONTEXT DATA (Include this in your 'context' field) ===\n"
-        + json.dumps(ctx, indent=2)
+        + orjson.dumps(ctx, option=orjson.OPT_INDENT_2).decode()
         + "\n=== END CONTEXT DATA ==="
     )
 
 
 async def _run_cfe(session_id: str, query: str, ic_data: Dict, ca_data: Dict, baseline_data: Dict) -> Dict[str, Any]:
-    system_prompt = _ENV.get_template("cfe_combination.jinja2").render()
+    system_prompt = _CFE_PROMPT
     context_text = _format_cfe_context(ic_data, ca_data, baseline_data)
     user_message = f"Session ID: {session_id}\nUser query: {query}\n\n{context_text}"
     data = await call_structured(
@@ -236,16 +239,26 @@ async def run_full_pipeline(session_id: str) -> CFEOutput:
 
     logger.info("[Gemma] Running pipeline for session %s, query: %.80s", session_id, query)
 
-    # Step 1: Intent classification
-    ic_data = await _run_ic(clarification_data)
-    ic_store = {**ic_data, "session_id": session_id, "db_ingestion_status": False}
-    await _fs_set("intent_classifier_responses", session_id, ic_store)
+    # The baseline recommender only needs the query, so start it alongside intent classification
+    baseline_task = asyncio.create_task(_run_baseline_recsys(query))
+    try:
+        # Step 1: Intent classification
+        ic_data = await _run_ic(clarification_data)
+        ic_store = {**ic_data, "session_id": session_id, "db_ingestion_status": False}
+
+        # Step 2: CA RecSys (needs IC) while the IC result is written; baseline is already running
+        _, ca_data = await asyncio.gather(
+            _fs_set("intent_classifier_responses", session_id, ic_store),
+            _run_ca_recsys(query, ic_data),
+        )
+        baseline_data = await baseline_task
+    finally:
+        if not baseline_task.done():
+            baseline_task.cancel()
+        # Wait for a cancelled baseline call to unwind and retrieve its outcome, so the task never
+        # warns "exception was never retrieved"; the error already propagating takes precedence
+        await asyncio.gather(baseline_task, return_exceptions=True)
 
-    # Step 2: Baseline RecSys and CA RecSys in parallel
-    baseline_data, ca_data = await asyncio.gather(
-        _run_baseline_recsys(query),
-        _run_ca_recsys(query, ic_data),
-    )
     await asyncio.gather(
         _fs_set("baseline_recommendations", session_id, {**baseline_data, "session_id": session_id}),
         _fs_set("context_aware_recommendations", session_id, {**ca_data, "session_id": session_id}),
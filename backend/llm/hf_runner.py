@@ -3,7 +3,7 @@ Async HuggingFace Inference API runner for structured output.
 Runs the synchronous InferenceClient in a thread pool to avoid blocking the event loop.
 """
 import asyncio
-import json
+import orjson
 import logging
 import re
 from concurrent.futures import ThreadPoolExecutor
@@ -62,7 +62,7 @@ async def call_structured(
     from config import settings
 
     resolved_model = model or settings.hf_gemma_model
-    schema_str = json.dumps(schema.model_json_schema(), indent=2)
+    schema_str = orjson.dumps(schema.model_json_schema(), option=orjson.OPT_INDENT_2).decode()
     json_footer = (
         "\n\n---\n"
         "CRITICAL INSTRUCTION: your entire response MUST be a single raw JSON object. "
@@ -86,8 +86,8 @@ async def call_structured(
                 max_tokens,
             )
             logger.debug("[HF] Raw response (attempt %d): %.300s", attempt + 1, raw)
-            return json.loads(_extract_json(raw))
-        except json.JSONDecodeError as exc:
+            return orjson.loads(_extract_json(raw))
+        except orjson.JSONDecodeError as exc:
             logger.warning("[HF] JSON parse failed (attempt %d): %s", attempt + 1, exc)
             last_error = exc
 
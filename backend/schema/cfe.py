@@ -1,6 +1,6 @@
 from __future__ import annotations
-from typing import Optional, List, Union
-from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from backend.schema.intentClassifier import IntentClassificationOutput
 from backend.schema.recSys import RecommendationContext
@@ -10,6 +10,9 @@ class CFEContext(BaseModel):
     """
     Complete context for CFE agent including intent classification and both recommendations.
     """
+    # Core schema is built on first use instead of at import
+    model_config = ConfigDict(defer_build=True)
+
     intent_classification: Optional[IntentClassificationOutput] = Field(
         None,
         description="Intent classification output containing user queries, clarifying Q&A, travel persona, and compromise details"
@@ -25,6 +28,8 @@ class CFEContext(BaseModel):
 
 
 class CFEOutput(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     session_id: str = Field(
         ...,
         description="Unique identifier for the recommendation session"
@@ -34,10 +39,18 @@ class CFEOutput(BaseModel):
         None,
         description="Complete context including intent classification, baseline and context-aware recommendations with their explanations"
     )
-    recommendation_shown: Union[str, List[str]] = Field(
+    recommendation_shown: List[str] = Field(
         ...,
         description="Final recommended city or list of cities after CFE analysis"
     )
+
+    @field_validator("recommendation_shown", mode="before")
+    @classmethod
+    def _coerce_recommendation_shown(cls, v):
+        if isinstance(v, str):
+            return [v]
+        return v
+
     is_recommendation_sustainable: bool = Field(
         ...,
         description="Indicates if the final recommendation is sustainable based on environmental criteria"
@@ -2,18 +2,29 @@ from __future__ import annotations
 
 from typing import Optional, List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 
 class ClarifyingQuestion(BaseModel):
+    # Never mutated after parsing; frozen so shared instances (e.g. fallback questions) stay intact.
+    # Core schema is built on first use instead of at import.
+    model_config = ConfigDict(frozen=True, defer_build=True)
+
     id: int = Field(..., description="A unique integer ID for the question.")
     question: str = Field(..., description="The actual text of the clarifying question.")
     answer: Optional[str] = Field(None, description="The answer to the clarifying question, if available.")
 
 
 class CQOutput(BaseModel):
+    model_config = ConfigDict(frozen=True, defer_build=True)
+
     query: str = Field(..., description="The original user query being clarified.")
     clarifying_questions: List[ClarifyingQuestion] = Field(
         ...,
         description="A list of generated clarifying questions to refine the user's intent."
     )
+
+
+# Validates a whole list of question dicts in one call instead of one model construction per item;
+# built on first use like the models themselves
+CQ_LIST_ADAPTER = TypeAdapter(List[ClarifyingQuestion], config=ConfigDict(defer_build=True))
@@ -2,31 +2,49 @@ from __future__ import annotations
 
 from typing import List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from backend.schema.cqGen import ClarifyingQuestion
 
+# Keys used by documents stored before the aliases were dropped, mapped to the field names
+_LEGACY_INPUT_CONTEXT_KEYS = {"user query": "user_query", "clarified Q&A": "clarified_qa"}
+_LEGACY_INTENT_KEYS = {"input": "input_data"}
+
+
+def _rename_legacy_keys(data, legacy_keys):
+    if isinstance(data, dict) and not legacy_keys.keys().isdisjoint(data):
+        return {legacy_keys.get(k, k): v for k, v in data.items()}
+    return data
+
 
 class InputContext(BaseModel):
     """
     Represents one interaction block containing the query and associated Q&A.
     """
+    # Core schema is built on first use instead of at import
+    model_config = ConfigDict(defer_build=True)
+
     user_query: str = Field(
         ...,
-        alias="user query",
         description="The initial query provided by the user."
     )
     clarified_qa: List[ClarifyingQuestion] = Field(
         ...,
-        alias="clarified Q&A",
         description="List of clarifying questions and answers associated with this query."
     )
 
+    @model_validator(mode="before")
+    @classmethod
+    def _accept_legacy_keys(cls, data):
+        return _rename_legacy_keys(data, _LEGACY_INPUT_CONTEXT_KEYS)
+
 
 class CompromiseDetails(BaseModel):
     """
     Breakdown of the user's willingness to compromise.
     """
+    model_config = ConfigDict(defer_build=True)
+
     willing_to_compromise: bool = Field(
         ...,
         description="True if the user indicates flexibility or willingness to change plans."
@@ -39,13 +57,14 @@ class CompromiseDetails(BaseModel):
 
 
 class IntentClassificationOutput(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     session_id: str = Field(
         ...,
         description="Unique identifier for the session this intent classification belongs to."
     )
     input_data: List[InputContext] = Field(
         ...,
-        alias="input",
         description="A history of the user's queries and the resulting clarified Q&A contexts."
     )
     user_travel_persona: str = Field(
@@ -65,3 +84,8 @@ class IntentClassificationOutput(BaseModel):
         default=False,
         description="Status indicating whether the intent classification response was successfully ingested into the database."
     )
+
+    @model_validator(mode="before")
+    @classmethod
+    def _accept_legacy_keys(cls, data):
+        return _rename_legacy_keys(data, _LEGACY_INTENT_KEYS)
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-from typing import Optional, List, Union
+from typing import Optional, List
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from backend.schema.intentClassifier import IntentClassificationOutput
-from constants import CITIES
 
 
 class RecsysOutput(BaseModel):
+    # Core schema is built on first use instead of at import
+    model_config = ConfigDict(defer_build=True)
+
     session_id: str = Field(
         ...,
         description="Unique identifier for the recommendation session"
@@ -19,11 +21,19 @@ class RecsysOutput(BaseModel):
         description="List of intent classification outputs containing user queries, clarifying Q&A, travel persona, "
                     "and compromise details"
     )
-    recommendation: Union[str, List[str]] = Field(
+    recommendation: List[str] = Field(
         ...,
         description="Recommended city or list of cities if explicitly requested"
     )
 
+    @field_validator("recommendation", mode="before")
+    @classmethod
+    def _coerce_recommendation(cls, v):
+        # A single city is stored as a one-item list, so the core type needs no union
+        if isinstance(v, str):
+            return [v]
+        return v
+
     explanation: str = Field(
         ...,
         description="Brief justification of why the recommendation fits",
@@ -44,7 +54,9 @@ class RecommendationContext(BaseModel):
     """
     Represents a recommendation with its explanation and trade-offs.
     """
-    recommendation: Optional[Union[str, List[str]]] = Field(
+    model_config = ConfigDict(defer_build=True)
+
+    recommendation: Optional[List[str]] = Field(
         None,
         description="Recommended city or list of cities"
     )
@@ -62,4 +74,6 @@ class RecommendationContext(BaseModel):
     def _coerce_recommendation(cls, v):
         if v is None or v == "":
             return None
+        if isinstance(v, str):
+            return [v]
         return v
@@ -2,10 +2,10 @@ import uvicorn
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from .endpoints import router
 from pathlib import Path
 from dotenv import load_dotenv
-from chainlit.utils import mount_chainlit
 
 env_path = Path(__file__).parent / ".env"
 load_dotenv(dotenv_path=env_path)
@@ -14,7 +14,8 @@ load_dotenv(dotenv_path=env_path)
 project_root = Path(__file__).parent.parent.parent
 os.environ["CHAINLIT_ROOT"] = str(project_root)
 
-app = FastAPI(title="CRS ADK Backend API")
+# orjson renders response bodies (orjson is already a dependency)
+app = FastAPI(title="CRS ADK Backend API", default_response_class=ORJSONResponse)
 
 # API routes live under /api/ so Chainlit can be mounted at root without conflicts
 app.include_router(router, prefix="/api")
@@ -33,9 +34,13 @@ app.add_middleware(
 async def health_check():
     return {"status": "healthy", "service": "CRS ADK Backend API"}
 
-# Mount Chainlit at root so HF Spaces iframe loads it directly (no redirect chain)
-chainlit_app_path = str(Path(__file__).parent.parent.parent / "app.py")
-mount_chainlit(app=app, target=chainlit_app_path, path="/")
+# Mount Chainlit at root so HF Spaces iframe loads it directly (no redirect chain).
+# API-only deployments set CHAINLIT_DISABLED=1 to skip importing Chainlit altogether.
+if os.getenv("CHAINLIT_DISABLED", "").lower() not in ("1", "true", "yes"):
+    from chainlit.utils import mount_chainlit
+
+    chainlit_app_path = str(Path(__file__).parent.parent.parent / "app.py")
+    mount_chainlit(app=app, target=chainlit_app_path, path="/")
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8001))
@@ -1,21 +1,29 @@
 import asyncio
 import os
 import time
+from contextlib import asynccontextmanager
 
 from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import Optional
 import datetime
 from backend.adk.agents.cfe.agent import get_cfe_agent
 from backend.adk.agents.intent_classification.agent import get_ic_agent
 from backend.adk.agents.recsys.agent import get_recsys_agent
 from backend.adk.assembly.pipeline import get_root_agent
-from backend.adk.assembly.run import _call_agent_async, get_model_response
+from backend.adk.assembly.run import (
+    ClarificationIncompleteError,
+    _call_agent_async,
+    _session_run,
+    get_model_response,
+    get_model_response_stream,
+)
 from backend.schema.cfe import CFEOutput, CFEContext
 from backend.schema.recSys import RecsysOutput, RecommendationContext
 from backend.schema.intentClassifier import IntentClassificationOutput
 from backend.schema.cqGen import CQOutput
 from backend.adk.agents.clar_q_gen.cq_generator import generate_clarifying_questions
-import json
+import orjson
 from utils.firestore_utils import ingest_response_firestore, get_firestore_client
 
 router = APIRouter(tags=["ADK Endpoints"])
@@ -33,20 +41,22 @@ _VERTEXAI_ENV_VARS = (
 )
 
 
-async def _with_gemini_key(coro, api_key: Optional[str]):
-    """Run *coro* using a user-supplied Gemini API key.
+@asynccontextmanager
+async def _gemini_key_env(api_key: Optional[str]):
+    """Use a user-supplied Gemini API key for the duration of the block.
 
     Temporarily sets GOOGLE_API_KEY and clears any Vertex AI env vars so that
     google-genai uses Gemini API key auth instead of Vertex AI credentials.
     """
     if not api_key:
-        return await coro
+        yield
+        return
     async with _gemini_key_lock:
         orig_api_key = os.environ.get("GOOGLE_API_KEY")
         orig_vertexai = {k: os.environ.pop(k, None) for k in _VERTEXAI_ENV_VARS}
         os.environ["GOOGLE_API_KEY"] = api_key
         try:
-            return await coro
+            yield
         finally:
             if orig_api_key is not None:
                 os.environ["GOOGLE_API_KEY"] = orig_api_key
@@ -57,6 +67,12 @@ async def _with_gemini_key(coro, api_key: Optional[str]):
                     os.environ[k] = v
 
 
+async def _with_gemini_key(coro, api_key: Optional[str]):
+    """Run *coro* using a user-supplied Gemini API key (see _gemini_key_env)."""
+    async with _gemini_key_env(api_key):
+        return await coro
+
+
 # ---------------------------------------------------------------------------
 # Clarifying questions
 # ---------------------------------------------------------------------------
@@ -95,16 +111,17 @@ async def get_intent_classifier_response(
 ):
     try:
         async def _gemini():
-            model_init = await get_ic_agent()
+            model_init = get_ic_agent()
             agent_name, response_text = None, None
-            async for name, text in _call_agent_async(
-                query=f"[SESSION_ID:{session_id}]",
-                root_agent=model_init,
-                session_id=session_id,
-            ):
-                agent_name, response_text = name, text
-
-            response = json.loads(response_text)
+            async with _session_run(session_id):
+                async for name, text in _call_agent_async(
+                    query=f"[SESSION_ID:{session_id}]",
+                    root_agent=model_init,
+                    session_id=session_id,
+                ):
+                    agent_name, response_text = name, text
+
+            response = orjson.loads(response_text)
             response["session_id"] = session_id
             ingestion_success = await ingest_response_firestore(
                 "intent_classifier_responses", session_id, response
@@ -132,24 +149,25 @@ async def get_recommender_response(
     try:
         async def _gemini():
             if has_context:
-                model_init = await get_recsys_agent(has_context=True)
+                model_init = get_recsys_agent(has_context=True)
                 collection_name = "context_aware_recommendations"
             else:
-                model_init = await get_recsys_agent(has_context=False)
+                model_init = get_recsys_agent(has_context=False)
                 collection_name = "baseline_recommendations"
 
             agent_name, response_text = None, None
-            async for name, text in _call_agent_async(
-                query=f"[SESSION_ID:{session_id}]",
-                root_agent=model_init,
-                session_id=session_id,
-            ):
-                agent_name, response_text = name, text
+            async with _session_run(session_id):
+                async for name, text in _call_agent_async(
+                    query=f"[SESSION_ID:{session_id}]",
+                    root_agent=model_init,
+                    session_id=session_id,
+                ):
+                    agent_name, response_text = name, text
 
             if not response_text or not response_text.strip():
                 raise HTTPException(status_code=502, detail="Empty response from recommendation agent")
 
-            response = json.loads(response_text)
+            response = orjson.loads(response_text)
             ingestion_success = await ingest_response_firestore(collection_name, session_id, response)
             response["db_ingestion_status"] = ingestion_success
             return RecsysOutput(**response)
@@ -174,16 +192,17 @@ async def get_cfe_response(
 ):
     try:
         async def _gemini():
-            model_init = await get_cfe_agent()
+            model_init = get_cfe_agent()
             agent_name, response_text = None, None
-            async for name, text in _call_agent_async(
-                query=f"[SESSION_ID:{session_id}]",
-                root_agent=model_init,
-                session_id=session_id,
-            ):
-                agent_name, response_text = name, text
-
-            response = json.loads(response_text)
+            async with _session_run(session_id):
+                async for name, text in _call_agent_async(
+                    query=f"[SESSION_ID:{session_id}]",
+                    root_agent=model_init,
+                    session_id=session_id,
+                ):
+                    agent_name, response_text = name, text
+
+            response = orjson.loads(response_text)
             ingestion_success = await ingest_response_firestore("cfe_responses", session_id, response)
             response["db_ingestion_status"] = ingestion_success
             return CFEOutput(**response)
@@ -239,6 +258,8 @@ async def run_pipeline(
 
     except HTTPException:
         raise
+    except ClarificationIncompleteError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -256,3 +277,65 @@ async def run_pipeline_all_responses(session_id: str):
         return {"session_id": session_id, "responses": all_responses}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _sse_event(data: str) -> str:
+    # Multi-line payloads need one "data:" field per line
+    return "".join(f"data: {line}\n" for line in data.split("\n")) + "\n"
+
+
+@router.get("/run-pipeline-stream")
+async def run_pipeline_stream(
+    session_id: str,
+    x_model_provider: str = Header(default="gemma", alias="X-Model-Provider"),
+    x_api_key: Optional[str] = Header(default=None, alias="X-Api-Key"),
+):
+    """
+    Same pipeline as /run-pipeline, as server-sent events. On the Gemini path the
+    CFE output is streamed while it decodes (with a user API key it is sent once the
+    run finishes); the Gemma pipeline does not stream, so only its final result is sent. Both end with a `result` event holding the
+    validated CFEOutput, then `done`; failures are sent as an `error` event.
+    """
+    async def _events():
+        try:
+            start_time = time.time()
+
+            if x_model_provider == "gemma":
+                from backend.llm.gemma_pipeline import run_full_pipeline as gemma_run
+                cfe_output = await gemma_run(session_id)
+            else:
+                async def _cfe_chunks():
+                    model_init = await get_root_agent()
+                    async for chunk in get_model_response_stream(
+                        query=f"[USER QUERY]: {session_id}]",
+                        root_agent=model_init,
+                        session_id=session_id,
+                    ):
+                        yield chunk
+
+                if x_api_key:
+                    # The key override is process-wide and held under _gemini_key_lock; collect
+                    # the output inside it and send it after, so a slow client can't hold the lock
+                    async with _gemini_key_env(x_api_key):
+                        chunks = [chunk async for chunk in _cfe_chunks()]
+                    for chunk in chunks:
+                        yield _sse_event(chunk)
+                else:
+                    chunks = []
+                    async for chunk in _cfe_chunks():
+                        chunks.append(chunk)
+                        yield _sse_event(chunk)
+                cfe_output = CFEOutput.model_validate_json("".join(chunks))
+
+            cfe_output.time_taken_seconds = time.time() - start_time
+            if x_model_provider != "gemma":
+                # The Gemma pipeline ingests its own CFE output
+                cfe_output.db_ingestion_status = await ingest_response_firestore(
+                    "cfe_pipeline_responses", session_id, cfe_output.model_dump()
+                )
+            yield f"event: result\n{_sse_event(cfe_output.model_dump_json())}"
+        except Exception as e:
+            yield f"event: error\n{_sse_event(str(e))}"
+        yield "event: done\ndata: \n\n"
+
+    return StreamingResponse(_events(), media_type="text/event-stream")
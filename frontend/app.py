@@ -282,6 +282,17 @@ async def on_message(message: cl.Message):
 # UI helpers
 # ---------------------------------------------------------------------------
 
+# Recommendation messages, keyed by whether the shown option is the sustainable choice
+_REC_MSG_TEMPLATES = {
+    True: "### 🌟 Your Recommendations 🌱✨\n**Destinations:** {recs} **[Sustainable Choice]** 🌿\n\n**Why?**\n{exp}",
+    False: "### 🌟 Your Recommendations\n**Destinations:** {recs}\n\n**Why?**\n{exp}",
+}
+_ALT_MSG_TEMPLATES = {
+    True: "### 🔄 Alternative Option 🌱✨\n**Destinations:** {recs} **[Sustainable Choice]** 🌿\n\n**Why this alternative?**\n{exp}",
+    False: "### 🔄 Alternative Option\n**Destinations:** {recs}\n\n**Why this alternative?**\n{exp}",
+}
+
+
 async def display_pipeline_results(pipeline_result: Dict[str, Any]):
     try:
         context = pipeline_result.get("context") or {}
@@ -300,16 +311,7 @@ async def display_pipeline_results(pipeline_result: Dict[str, Any]):
 
         if cfe_rec:
             recs_formatted = ", ".join(cfe_rec) if isinstance(cfe_rec, list) else str(cfe_rec)
-            if is_sustainable:
-                rec_msg = (
-                    f"### 🌟 Your Recommendations 🌱✨\n"
-                    f"**Destinations:** {recs_formatted} **[Sustainable Choice]** 🌿\n\n**Why?**\n{cfe_exp}"
-                )
-            else:
-                rec_msg = (
-                    f"### 🌟 Your Recommendations\n"
-                    f"**Destinations:** {recs_formatted}\n\n**Why?**\n{cfe_exp}"
-                )
+            rec_msg = _REC_MSG_TEMPLATES[bool(is_sustainable)].format(recs=recs_formatted, exp=cfe_exp)
             await cl.Message(content=rec_msg, author="Assistant").send()
             cl.user_session.set("recommendation_shown", recs_formatted)
 
@@ -318,16 +320,8 @@ async def display_pipeline_results(pipeline_result: Dict[str, Any]):
 
         if alt_rec:
             alt_formatted = ", ".join(alt_rec) if isinstance(alt_rec, list) else str(alt_rec)
-            if not is_sustainable:
-                alt_msg = (
-                    f"### 🔄 Alternative Option 🌱✨\n"
-                    f"**Destinations:** {alt_formatted} **[Sustainable Choice]** 🌿\n\n**Why this alternative?**\n{alt_exp}"
-                )
-            else:
-                alt_msg = (
-                    f"### 🔄 Alternative Option\n"
-                    f"**Destinations:** {alt_formatted}\n\n**Why this alternative?**\n{alt_exp}"
-                )
+            # The alternative is the sustainable one when the main recommendation is not
+            alt_msg = _ALT_MSG_TEMPLATES[not is_sustainable].format(recs=alt_formatted, exp=alt_exp)
             await cl.Message(content=alt_msg, author="Assistant").send()
             cl.user_session.set("alternative_recommendation", alt_formatted)
 
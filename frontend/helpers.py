@@ -3,13 +3,14 @@ Frontend Helper Functions
 Reusable utilities for the Chainlit app
 """
 import chainlit as cl
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import uuid
 from datetime import datetime
 from database.config import get_conversation_store
 from pathlib import Path
 import json
 import random
+from functools import lru_cache
 
 
 async def get_or_create_session_id() -> str:
@@ -214,22 +215,23 @@ def create_action(
     return action
 
 
-def _load_filtered_queries() -> List[str]:
-    """Load query_text values from filtered_queries.json"""
+@lru_cache(maxsize=1)
+def _load_filtered_queries() -> Tuple[str, ...]:
+    """Load query_text values from filtered_queries.json (read once; the file is static)"""
     public_path = Path(__file__).resolve().parents[1] / "public" / "filtered_queries.json"
     if not public_path.exists():
-        return []
+        return ()
 
     try:
         data = json.loads(public_path.read_text(encoding="utf-8"))
     except (json.JSONDecodeError, OSError):
-        return []
+        return ()
 
     if not isinstance(data, list):
-        return []
+        return ()
 
     queries = [item.get("query_text") for item in data if isinstance(item, dict)]
-    return [q for q in queries if isinstance(q, str) and q.strip()]
+    return tuple(q for q in queries if isinstance(q, str) and q.strip())
 
 
 def create_sample_query_actions(seed: Optional[str] = None):
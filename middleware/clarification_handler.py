@@ -12,6 +12,9 @@ import os
 class ClarificationState:
     """Tracks the state of clarifying questions for a session"""
 
+    # Rebuilt from the session dict on every turn, so keep instances lean
+    __slots__ = ("original_query", "questions", "answers", "current_index")
+
     def __init__(self, questions: List[Dict[str, Any]], original_query: str):
         self.original_query = original_query
         self.questions = questions
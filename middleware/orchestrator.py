@@ -4,6 +4,7 @@ Connects Chainlit frontend to backend agents.
 model_provider ("gemma" | "gemini") and api_key are forwarded from the Chainlit session
 to the backend via HTTP headers on every request.
 """
+import re
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from config import settings
@@ -11,12 +12,31 @@ from database.config import get_session_store, get_conversation_store
 from middleware.clarification_handler import ClarificationHandler, ClarificationState
 
 
+# Substring match against any keyword, compiled into one alternation so the message is scanned once
+_DESTINATION_KEYWORDS_RE = re.compile("|".join(map(re.escape, [
+    "find", "suggest", "recommend", "looking for", "want to", "travel",
+    "visit", "trip", "europe", "city", "place", "destination", "where",
+    "going to", "planning", "holiday", "vacation", "tourism", "tour",
+    "spain", "france", "italy", "germany", "country", "countries",
+])))
+
+
 class SessionManager:
     def __init__(self):
         self.store = get_session_store()
         self.timeout = settings.session_timeout
         self.max_history = settings.max_conversation_history
 
+    @staticmethod
+    def _ensure_session(session: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in any missing state keys once, so the turn handlers can index them directly."""
+        session.setdefault("collected_entities", {})
+        session.setdefault("conversation_history", [])
+        session.setdefault("clarification_state", None)
+        session.setdefault("clarification_complete", False)
+        session.setdefault("original_clarification_query", None)
+        return session
+
     async def get_or_create_session(self, session_id: str) -> Dict[str, Any]:
         session = await self.store.get_session(session_id)
         if session is None:
@@ -24,7 +44,7 @@ class SessionManager:
                 "collected_entities": {},
                 "conversation_history": [],
             })
-        return session
+        return self._ensure_session(session)
 
     async def update_session(self, session_id: str, updates: Dict[str, Any]):
         await self.store.update_session(session_id, updates)
@@ -58,17 +78,19 @@ class ConversationOrchestrator:
     ) -> Dict[str, Any]:
         print(f"[ORCHESTRATOR] Processing message with session_id: {session_id}")
         session_state = await self.session_manager.get_or_create_session(session_id)
-        print(f"[ORCHESTRATOR] Session has {len(session_state.get('conversation_history', []))} messages in history")
+        print(f"[ORCHESTRATOR] Session has {len(session_state['conversation_history'])} messages in history")
 
-        if session_state.get("clarification_complete") and not self.is_clarification_active(session_state):
+        # The reset below only runs when no flow is active, so this holds for the whole turn
+        clarification_active = self.is_clarification_active(session_state)
+
+        if session_state["clarification_complete"] and not clarification_active:
             session_state["clarification_complete"] = False
             session_state["clarification_state"] = None
             session_state["original_clarification_query"] = None
-            if "collected_entities" in session_state:
-                session_state["collected_entities"].pop("clarification_answers", None)
+            session_state["collected_entities"].pop("clarification_answers", None)
             await self.session_manager.update_session(session_id, session_state)
 
-        if self.is_clarification_active(session_state):
+        if clarification_active:
             return await self.handle_clarification_answer(message, session_id)
 
         if self.should_trigger_clarification(message, session_state):
@@ -130,11 +152,12 @@ class ConversationOrchestrator:
     # Clarification flow helpers
     # ------------------------------------------------------------------
 
-    def _add_to_history(self, session_state, role, content, metadata=None):
+    def _add_to_history(self, session_state, role, content, metadata=None, timestamp=None):
+        # Entries logged for the same turn share one timestamp passed in by the caller
         session_state["conversation_history"].append({
             "role": role,
             "content": content,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp or datetime.now().isoformat(),
             "metadata": metadata or {},
         })
 
@@ -163,8 +186,8 @@ class ConversationOrchestrator:
             existing = await self.conversation_store.get_conversation(session_id)
 
             clarification_data = None
-            clarification_complete = session_state.get("clarification_complete", False)
-            clarification_state_dict = session_state.get("clarification_state")
+            clarification_complete = session_state["clarification_complete"]
+            clarification_state_dict = session_state["clarification_state"]
 
             if clarification_state_dict:
                 clarification_data = {
@@ -172,8 +195,8 @@ class ConversationOrchestrator:
                     "clarifying_questions": clarification_state_dict.get("questions", []),
                     "clarification_complete": clarification_complete,
                 }
-            elif session_state.get("clarification_complete"):
-                answers = session_state.get("collected_entities", {}).get("clarification_answers", {})
+            elif clarification_complete:
+                answers = session_state["collected_entities"].get("clarification_answers", {})
                 if answers:
                     questions_with_answers = [
                         {
@@ -184,7 +207,7 @@ class ConversationOrchestrator:
                         for q_id, ans_data in sorted(answers.items(), key=lambda x: int(x[0]))
                     ]
                     clarification_data = {
-                        "query": session_state.get("original_clarification_query", ""),
+                        "query": session_state["original_clarification_query"] or "",
                         "clarifying_questions": questions_with_answers,
                         "clarification_complete": True,
                     }
@@ -219,11 +242,13 @@ class ConversationOrchestrator:
         )
 
         if not clarification_state:
-            self._add_to_history(session_state, "user", query, {"type": "out_of_scope_query"})
+            now = datetime.now().isoformat()
+            self._add_to_history(session_state, "user", query, {"type": "out_of_scope_query"}, now)
             self._add_to_history(
                 session_state, "assistant",
                 "Query is beyond the scope of European city recommendation.",
                 {"type": "out_of_scope_response"},
+                now,
             )
             await self._save_conversation(session_id, session_state)
 
@@ -232,8 +257,7 @@ class ConversationOrchestrator:
                 "clarification_complete": False,
                 "original_clarification_query": None,
             })
-            if "collected_entities" in session_state:
-                session_state["collected_entities"].pop("clarification_answers", None)
+            session_state["collected_entities"].pop("clarification_answers", None)
             await self.session_manager.update_session(session_id, session_state)
             return self.clarification_handler.format_out_of_scope()
 
@@ -248,7 +272,7 @@ class ConversationOrchestrator:
 
     async def handle_clarification_answer(self, answer: str, session_id: str) -> Dict[str, Any]:
         session_state = await self.session_manager.get_or_create_session(session_id)
-        state_dict = session_state.get("clarification_state")
+        state_dict = session_state["clarification_state"]
         if not state_dict:
             return self._create_error_response("No active clarification flow found")
 
@@ -260,20 +284,21 @@ class ConversationOrchestrator:
         clarification_state.add_answer(current_question["id"], answer)
         session_state["clarification_state"] = clarification_state.to_dict()
 
-        if "clarification_answers" not in session_state["collected_entities"]:
-            session_state["collected_entities"]["clarification_answers"] = {}
-        session_state["collected_entities"]["clarification_answers"][str(current_question["id"])] = {
+        session_state["collected_entities"].setdefault("clarification_answers", {})[str(current_question["id"])] = {
             "question": current_question["question"],
             "answer": answer,
         }
 
+        now = datetime.now().isoformat()
         self._add_to_history(
             session_state, "assistant", current_question["question"],
             {"type": "clarification_question", "question_id": current_question["id"]},
+            now,
         )
         self._add_to_history(
             session_state, "user", answer,
             {"type": "clarification_answer", "question_id": current_question["id"]},
+            now,
         )
         await self._update_and_save_session(session_id, session_state)
 
@@ -291,9 +316,9 @@ class ConversationOrchestrator:
 
     async def get_clarification_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
         session_state = await self.session_manager.get_or_create_session(session_id)
-        state_dict = session_state.get("clarification_state")
+        state_dict = session_state["clarification_state"]
         if not state_dict:
-            return session_state.get("collected_entities", {}).get("clarification_answers")
+            return session_state["collected_entities"].get("clarification_answers")
         return ClarificationState.from_dict(state_dict).get_summary()
 
     def is_clarification_active(self, session_state: Dict[str, Any]) -> bool:
@@ -307,15 +332,10 @@ class ConversationOrchestrator:
             return False
         if self.is_clarification_active(session_state):
             return False
-        if len(message.lower().strip()) < 5:
+        message_lower = message.lower()
+        if len(message_lower.strip()) < 5:
             return False
-        destination_keywords = [
-            "find", "suggest", "recommend", "looking for", "want to", "travel",
-            "visit", "trip", "europe", "city", "place", "destination", "where",
-            "going to", "planning", "holiday", "vacation", "tourism", "tour",
-            "spain", "france", "italy", "germany", "country", "countries",
-        ]
-        return any(kw in message.lower() for kw in destination_keywords)
+        return _DESTINATION_KEYWORDS_RE.search(message_lower) is not None
 
 
 # Singleton instance
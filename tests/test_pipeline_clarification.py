@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from google.adk.agents import LlmAgent, SequentialAgent
+
+from backend.adk.agents.intent_classification.agent import build_ic_agent
+from backend.adk.assembly import run
+from backend.adk.tools import intent_classifier
+from backend.adk.tools.cfe import skip_if_clarification_incomplete
+from backend.schema.cfe import CFEOutput
+
+SESSION_ID = "test-clarification-incomplete"
+
+
+def _build_pipeline():
+    """IC followed by the CFE merger, wired as in create_pipeline (recommenders left out)."""
+    merger_agent = LlmAgent(
+        name="CFEAgent",
+        model='gemini-2.5-flash',
+        instruction="Combine the recommendations.",
+        output_schema=CFEOutput,
+        before_model_callback=skip_if_clarification_incomplete
+    )
+    return SequentialAgent(name="CRSPipeline", sub_agents=[build_ic_agent(), merger_agent])
+
+
+@pytest.fixture
+def incomplete_clarification(monkeypatch):
+    async def fake_get_firestore_document(collection_name, session_id, error_message, log_prefix="[Callback]"):
+        # Yield like a real Firestore read, so concurrent runs interleave
+        await asyncio.sleep(0.01)
+        return {"clarification_data": {"query": "Trip to Europe", "clarification_complete": False}}, None
+
+    monkeypatch.setattr(intent_classifier, "get_firestore_document", fake_get_firestore_document)
+
+
+@pytest.mark.asyncio
+async def test_cfe_only_run_raises_when_clarification_incomplete(incomplete_clarification):
+    with pytest.raises(run.ClarificationIncompleteError):
+        await run.get_model_response(
+            query=f"[USER QUERY]: {SESSION_ID}]",
+            root_agent=_build_pipeline(),
+            session_id=SESSION_ID,
+            return_cfe_only=True,
+        )
+
+    # The run's session is still cleaned up
+    assert await run._SESSION_SERVICE.get_session(
+        app_name=run.APP_NAME, user_id=run.USER_ID, session_id=SESSION_ID
+    ) is None
+
+
+@pytest.mark.asyncio
+async def test_all_responses_run_returns_skip_notices(incomplete_clarification):
+    responses = await run.get_model_response(
+        query=f"[USER QUERY]: {SESSION_ID}]",
+        root_agent=_build_pipeline(),
+        session_id=SESSION_ID,
+    )
+
+    assert [r["agent_name"] for r in responses] == ["intent_classification", "CFEAgent"]
+
+
+@pytest.mark.asyncio
+async def test_stream_raises_instead_of_streaming_skip_notice(incomplete_clarification):
+    chunks = []
+    with pytest.raises(run.ClarificationIncompleteError):
+        async for chunk in run.get_model_response_stream(
+            query=f"[USER QUERY]: {SESSION_ID}]",
+            root_agent=_build_pipeline(),
+            session_id=SESSION_ID,
+        ):
+            chunks.append(chunk)
+
+    assert chunks == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_on_same_session_id(incomplete_clarification):
+    results = await asyncio.gather(
+        *(
+            run.get_model_response(
+                query=f"[USER QUERY]: {SESSION_ID}]",
+                root_agent=_build_pipeline(),
+                session_id=SESSION_ID,
+            )
+            for _ in range(2)
+        ),
+        return_exceptions=True,
+    )
+
+    for responses in results:
+        assert not isinstance(responses, BaseException), responses
+        assert [r["agent_name"] for r in responses] == ["intent_classification", "CFEAgent"]
+    assert SESSION_ID not in run._SESSION_LOCKS
@@ -1,4 +1,6 @@
+import asyncio
 import os
+import weakref
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -6,9 +8,9 @@ from google.cloud import firestore
 from google.oauth2 import service_account
 
 
-def get_firestore_client() -> firestore.Client:
+def _firestore_client_kwargs() -> dict:
     """
-    Initialize Firestore client with credentials from settings.
+    Resolve Firestore project and credentials from settings.
     Supports both explicit service account files and Application Default Credentials (ADC).
 
     Priority:
@@ -17,7 +19,7 @@ def get_firestore_client() -> firestore.Client:
     3. Application Default Credentials (Cloud Run, GCE, etc.)
 
     Returns:
-        Configured Firestore client
+        Keyword arguments for firestore.Client / firestore.AsyncClient
     """
     # Get project root - go up from utils/ to crs-chatbot/
     project_root = Path(__file__).parent.parent
@@ -70,18 +72,49 @@ def get_firestore_client() -> firestore.Client:
         if not os.path.exists(credentials_path):
             print(f"[Firestore] WARNING: Credentials file not found: {credentials_path}")
             print(f"[Firestore] Falling back to Application Default Credentials")
-            return firestore.Client(project=project_id)
+            return {"project": project_id}
 
         print(f"[Firestore] Using explicit credentials: {credentials_path}")
 
         # Load credentials explicitly
         credentials = service_account.Credentials.from_service_account_file(credentials_path)
-        return firestore.Client(project=project_id, credentials=credentials)
+        return {"project": project_id, "credentials": credentials}
     else:
         # Use Application Default Credentials (ADC)
         # This works on Cloud Run, GCE, GKE, or local with `gcloud auth application-default login`
         print(f"[Firestore] Using Application Default Credentials for project: {project_id}")
-        return firestore.Client(project=project_id)
+        return {"project": project_id}
+
+
+def get_firestore_client() -> firestore.Client:
+    """
+    Initialize Firestore client with credentials from settings.
+    See _firestore_client_kwargs() for how credentials are resolved.
+
+    Returns:
+        Configured Firestore client
+    """
+    return firestore.Client(**_firestore_client_kwargs())
+
+
+# gRPC aio channels are bound to the event loop that created them, so keep one client per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, firestore.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_async_firestore_client() -> firestore.AsyncClient:
+    """
+    Return the async Firestore client for the running event loop, creating it on first use.
+    Credentials are resolved the same way as get_firestore_client().
+
+    Returns:
+        Configured Firestore AsyncClient
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = firestore.AsyncClient(**_firestore_client_kwargs())
+        _async_clients[loop] = client
+    return client
 
 
 async def ingest_response_firestore(collection_name, session_id, response) -> bool: